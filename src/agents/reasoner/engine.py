@@ -1,9 +1,13 @@
 import jinja2
 import json
+import threading
+from typing import Optional
 from pydantic import BaseModel
 
+from src.lib.cancellation import check_cancelled
+from src.lib.prepared_prompt import PreparedPrompt
 from src.lib.system_info import SystemInfo
-from src.llm import LLMProvider
+from src.llm import LLMProvider, DiskCache
 
 env = jinja2.Environment(loader=jinja2.PackageLoader("src.agents.reasoner", ""))
 template = env.get_template("system.j2")
@@ -22,18 +26,38 @@ class ReasoningAgent:
     2. display_content: Detailed markdown for display
     """
     
-    def __init__(self):
-        self.llm = LLMProvider("gemini")
-
-    @property
-    def system_prompt(self) -> str:
-        return template.render(
+    def __init__(self, provider: Optional[str] = None, model: Optional[str] = None):
+        """
+        Args:
+            provider: LLM provider (LLM_PROVIDER by default, e.g. "replay").
+            model: Model of that provider.
+        """
+        # Answers are tool-free; keep them across restarts for a day. The key
+        # covers the whole prompt: follow-ups ("now in Python") only make
+        # sense with the conversation they refer to
+        self.llm = LLMProvider(
+            provider,
+            model,
+            cache=DiskCache(),
+            cache_ttl_sec=24 * 3600,
+            normalize_cache_key=True
+        )
+        self.prompt = PreparedPrompt(template, lambda: dict(
             user_os = SystemInfo.USER_OS,
             current_date = SystemInfo.CURRENT_DATE,
             current_dir = SystemInfo.CURRENT_WORKING_DIRECTORY,
-        )
+        ))
+
+    @property
+    def system_prompt(self) -> str:
+        return self.prompt.render()
     
-    def reason(self, query: str) -> dict:        
+    def reason(self, query: str, cancel_event: Optional[threading.Event] = None) -> dict:
+        """
+        Answer a complex query.
+        Raises TurnCancelled before and after the model call once `cancel_event` is set.
+        """
+        check_cancelled(cancel_event)
         print(f"\n🧠 REASONING: {query}\n")
     
         print("🤔 Analyzing problem...")
@@ -45,6 +69,7 @@ class ReasoningAgent:
             json_mode=True,
             response_schema=ReasonerOutput
         )
+        check_cancelled(cancel_event)
         
         if not response.text_content:
             return {
@@ -1,3 +1,4 @@
-from .engine import RouterAgent
+from .engine import RouterAgent, RouterDecision
+from .speculation import SpeculativeRouter
 
-__all__ = ["RouterAgent"]
+__all__ = ["RouterAgent", "RouterDecision", "SpeculativeRouter"]
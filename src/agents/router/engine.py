@@ -1,63 +1,368 @@
 import jinja2
 import json
-from typing import Dict, List, Optional
-from src.llm import LLMProvider
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
+from pydantic import BaseModel, ValidationError
+from src.lib.cancellation import LinkedCancelEvent, TurnCancelled, check_cancelled
+from src.lib.prepared_prompt import PreparedPrompt
+from src.lib.text import instruction_of, with_context
+from src.llm import LLMProvider, MemoryCache
+from src.llm.llm_response import LLMResponse
 from src.tts import TTSProvider
+from src.tts.speech_pipeline import NullSpeech, SpeechPipeline
 from src.agents.task.engine import TaskAgent
 from src.agents.reasoner.engine import ReasoningAgent
+from src.agents.router.stream_parser import RouterStreamParser
+from src.agents.router.intent import ACKNOWLEDGEMENTS, IntentClassifier
 import threading
 
 env = jinja2.Environment(loader=jinja2.PackageLoader("src.agents.router", ""))
 template = env.get_template("system.j2")
 
+# Outermost {...} of a reply, e.g. when the model wrapped it in a code fence
+_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+
+REPAIR_PROMPT = """Your previous reply was not a valid routing decision.
+
+Reply:
+{reply}
+
+Problem:
+{error}
+
+Return only the corrected JSON object."""
+
+class RouterDecision(BaseModel):
+    type: Literal["instant_response", "tool_invocation", "advanced_reasoning"]
+    response_text: str
+
+def _cacheable_decision(response: LLMResponse) -> bool:
+    # The cache key leaves out the conversation. Instant responses answer
+    # from it, and a short reply ("yes", "do it") may only be a tool request
+    # because of it, which must never run commands from a cached guess; so
+    # only the reasoning route is reused
+    try:
+        return json.loads(response.text_content or "").get("type") == "advanced_reasoning"
+    except (ValueError, AttributeError):
+        return False
+
+@dataclass
+class EarlyWork:
+    """Task/reasoning work started from a streamed, not yet validated `type`."""
+    type: str
+    future: Future
+    cancel_event: LinkedCancelEvent
+
+    def cancel(self) -> None:
+        # Stops at the work's next checkpoint, e.g. before any tool runs
+        self.cancel_event.set()
+        self.future.cancel()
+
+COULD_NOT_PROCESS = "Sorry, I couldn't process your request."
+PLEASE_REPEAT = "I’m sorry, could you repeat that?"
+
 class RouterAgent:
-    def __init__(self, set_content_area_ui):
-        self.llm = LLMProvider("gemini")
-        self.tts_service = TTSProvider("piperTTS")
+    # Tokens of conversation context sent with each routing request
+    context_budget = 1500
+
+    # Rendered into the TTS cache at startup so they play without delay
+    warmup_phrases = [COULD_NOT_PROCESS, PLEASE_REPEAT, *ACKNOWLEDGEMENTS.values()]
+
+    def __init__(
+        self,
+        set_content_area_ui,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        tts_provider: Optional[str] = "piperTTS"
+    ):
+        """
+        Args:
+            set_content_area_ui: Shows reasoning output in the UI.
+            provider: LLM provider of the router and its agents
+                (LLM_PROVIDER by default, e.g. "replay").
+            model: Model of that provider.
+            tts_provider: Key in TTS_PROVIDER_MAP, or None to stay silent
+                (benchmarks, tests).
+        """
+        # Routing makes no tool calls; repeated requests reuse the decision,
+        # keyed on the current message rather than the whole conversation
+        self.llm = LLMProvider(
+            provider,
+            model,
+            cache=MemoryCache(),
+            cache_ttl_sec=600,
+            normalize_cache_key=True,
+            cache_key_text=instruction_of,
+            cacheable=_cacheable_decision
+        )
+        self.prompt = PreparedPrompt(template)
+        if tts_provider is not None:
+            self.tts_service = TTSProvider(tts_provider)
+            # Utterances of a turn are spoken in order, without blocking routing;
+            # the next sentence is synthesized while the current one plays
+            self.speech = SpeechPipeline(self.tts_service.tts)
+            self.tts_service.tts.warm_up(self.warmup_phrases)
+        else:
+            self.speech = NullSpeech()
+        # Task/reasoning work started before the router response completes
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="router-work")
+
+        # Answers trivial intents locally and learns routes from the LLM
+        self.intents = IntentClassifier()
 
         # Instantiate agents
-        self.task_agent = TaskAgent()
-        self.reasoner = ReasoningAgent()
+        self.task_agent = TaskAgent(provider, model)
+        self.reasoner = ReasoningAgent(provider, model)
 
         self.set_content_area_ui = set_content_area_ui
     
     @property
     def system_prompt(self):
-        return template.render()
+        return self.prompt.render()
     
-    def run(self, instruction: str, history: Optional[List[Dict[str, str]]] = None) -> Optional[str]:
+    def build_prompt(
+        self,
+        instruction: str,
+        history: Optional[List[Dict[str, str]]] = None,
+        context: Optional[str] = None
+    ) -> str:
+        """
+        Combine the instruction with prior conversation. `context` is a
+        preformatted window (see ContextWindow) and takes precedence over
+        building one from raw `history` messages.
+        """
+        # Build context from conversation history if provided
+        context_text = context or ""
+        if not context_text and history:
+            for msg in history:
+                role = msg.get("role", "").upper()
+                content = msg.get("content", "")
+                context_text += f"{role}: {content}\n"
         
-        try:
-            # Build context from conversation history if provided
-            context_text = ""
-            if history:
-                for msg in history:
-                    role = msg.get("role", "").upper()
-                    content = msg.get("content", "")
-                    context_text += f"{role}: {content}\n"
-            
-            # Combine history context with current instruction
-            full_text = instruction
-            if context_text:
-                full_text = f"Conversation history:\n{context_text}\nCurrent message: {instruction}"
+        # Combine history context with current instruction
+        return with_context(instruction, context_text)
 
-            print(f"RouterAgent sending to LLM:\n{full_text}")
-            
-            response = self.llm.model.inference(
-                contents=full_text,
-                system_prompt=self.system_prompt
+    def decide(self, full_text: str) -> Dict[str, Any]:
+        """
+        Classify the request. Has no side effects, so it is safe to run
+        speculatively on an interim transcript and throw the result away.
+        """
+        print(f"RouterAgent sending to LLM:\n{full_text}")
+        
+        response = self.llm.model.inference(
+            contents=full_text,
+            system_prompt=self.system_prompt,
+            json_mode=True,
+            response_schema=RouterDecision
+        )
+
+        if not response.text_content:
+            return {}
+
+        decision, error = self._parse_decision(response.text_content)
+        if decision is None:
+            decision = self._repair(response.text_content, error)
+        return decision.model_dump()
+
+    async def adecide(self, full_text: str, timeout: Optional[float] = 20.0) -> Dict[str, Any]:
+        """Async `decide` on the provider's native async path (cancellable)."""
+        print(f"RouterAgent sending to LLM (async):\n{full_text}")
+
+        response = await self.llm.model.ainference(
+            contents=full_text,
+            system_prompt=self.system_prompt,
+            json_mode=True,
+            response_schema=RouterDecision,
+            timeout=timeout
+        )
+
+        if not response.text_content:
+            return {}
+
+        decision, error = self._parse_decision(response.text_content)
+        if decision is None:
+            repair = await self.llm.model.ainference(
+                contents=REPAIR_PROMPT.format(reply=response.text_content, error=error),
+                system_prompt=self.system_prompt,
+                json_mode=True,
+                response_schema=RouterDecision,
+                timeout=timeout
             )
+            decision = self._parse_repair(repair.text_content or "")
+        return decision.model_dump()
 
-            if not response.text_content:
-                self.tts_service.speak("Sorry, I couldn't process your request.")
-                return "Could not process the request."
+    @staticmethod
+    def _parse_decision(text: str) -> Tuple[Optional[RouterDecision], str]:
+        """
+        Validate a router reply against RouterDecision, salvaging the JSON
+        object from surrounding prose or code fences first if needed.
 
-            jsonData = {}
+        Returns:
+            (decision or None, validation error message)
+        """
+        try:
+            return RouterDecision.model_validate_json(text), ""
+        except ValidationError as e:
+            error = str(e)
 
+        match = _JSON_OBJECT.search(text)
+        if match and match.group(0) != text:
             try:
-                jsonData = json.loads(response.text_content)
-            except:
-                raise Exception("LLM returned a non-json")
+                return RouterDecision.model_validate_json(match.group(0)), ""
+            except ValidationError:
+                pass
+
+        return None, error
+
+    def _repair(self, reply: str, error: str) -> RouterDecision:
+        """
+        One cheap retry: hand the invalid reply and the validation error
+        back to the model instead of failing the whole voice turn.
+        """
+        print(f"⚠️ Router reply failed validation, asking for a repair: {error}")
+
+        response = self.llm.model.inference(
+            contents=REPAIR_PROMPT.format(reply=reply, error=error),
+            system_prompt=self.system_prompt,
+            json_mode=True,
+            response_schema=RouterDecision
+        )
+
+        return self._parse_repair(response.text_content or "")
+
+    @classmethod
+    def _parse_repair(cls, text: str) -> RouterDecision:
+        decision, error = cls._parse_decision(text)
+        if decision is None:
+            raise Exception(f"LLM returned an invalid decision: {error}")
+        return decision
+
+    def _stream_decision(
+        self,
+        full_text: str,
+        cancel_event: Optional[threading.Event] = None
+    ) -> Tuple[Dict[str, Any], Optional[EarlyWork]]:
+        """
+        Stream the routing decision. Sentences of `response_text` are queued
+        for speech as soon as they are complete, and task/reasoning work is
+        started as soon as `type` is known, before the JSON is closed. That
+        work is cancelled if the validated decision disagrees or routing
+        fails.
+
+        Returns:
+            (decision, work matching the decision's type, or None)
+        """
+        print(f"RouterAgent streaming from LLM:\n{full_text}")
+
+        parser = RouterStreamParser()
+        early_work: Optional[EarlyWork] = None
+
+        try:
+            for chunk in self.llm.model.stream_inference(
+                contents=full_text,
+                system_prompt=self.system_prompt,
+                json_mode=True,
+                response_schema=RouterDecision,
+                on_first_token=lambda sec: print(f"⏱️ Router first token in {sec * 1000:.0f} ms")
+            ):
+                check_cancelled(cancel_event)
+
+                for sentence in parser.feed(chunk.text_delta):
+                    self.speech.say(sentence)
+
+                if early_work is None and parser.type is not None:
+                    early_work = self._start_work(parser.type, full_text, cancel_event)
+
+            self.speech.say(parser.remaining_text())
+
+            if not parser.buffer.strip():
+                self._cancel_work(early_work)
+                return {}, None
+
+            decision, error = self._parse_decision(parser.buffer)
+            if decision is None:
+                decision = self._repair(parser.buffer, error)
+                if not parser.response_text:
+                    # Nothing was spoken from the broken stream
+                    self.speech.say(decision.response_text)
+
+            if early_work is not None and early_work.type != decision.type:
+                print(f"↩️ Routed to {decision.type}, dropping early {early_work.type} work")
+                self._cancel_work(early_work)
+                early_work = None
+            if early_work is None:
+                early_work = self._start_work(decision.type, full_text, cancel_event)
+            return decision.model_dump(), early_work
+        except BaseException:
+            self._cancel_work(early_work)
+            raise
+
+    def _start_work(
+        self,
+        type: str,
+        full_text: str,
+        cancel_event: Optional[threading.Event] = None
+    ) -> Optional[EarlyWork]:
+        work_cancel = LinkedCancelEvent(cancel_event)
+        if type == "tool_invocation":
+            future = self.executor.submit(self.task_agent.execute_task, full_text, work_cancel)
+        elif type == "advanced_reasoning":
+            future = self.executor.submit(self.reasoner.reason, full_text, work_cancel)
+        else:
+            return None
+        return EarlyWork(type, future, work_cancel)
+
+    @staticmethod
+    def _cancel_work(work: Optional[EarlyWork]) -> None:
+        if work is not None:
+            work.cancel()
+
+    def run(
+        self,
+        instruction: str,
+        history: Optional[List[Dict[str, str]]] = None,
+        decision: Optional[Dict[str, Any]] = None,
+        context: Optional[str] = None,
+        cancel_event: Optional[threading.Event] = None,
+        on_progress: Optional[Callable[[str], None]] = None
+    ) -> Optional[str]:
+        """
+        Route and execute a request. `decision` may carry a routing result
+        computed ahead of time (see SpeculativeRouter); otherwise the router
+        response is streamed here and speaking starts with its first sentence.
+
+        Raises TurnCancelled if `cancel_event` gets set; `on_progress`
+        receives short status lines for the UI.
+        """
+        progress = on_progress or (lambda _: None)
+        early_work: Optional[EarlyWork] = None
+        
+        try:
+            full_text = self.build_prompt(instruction, history, context)
+
+            fast = self.intents.classify(instruction) if decision is None else None
+            if fast:
+                print(f"⚡ Fast path ({fast.source}, {fast.confidence:.2f}): {fast.type}")
+                jsonData = fast.as_decision()
+                self.speech.say(jsonData["response_text"])
+            elif decision is None:
+                progress("Thinking...")
+                jsonData, early_work = self._stream_decision(full_text, cancel_event)
+            else:
+                jsonData = decision
+                self.speech.say(jsonData.get("response_text") or "")
+            check_cancelled(cancel_event)
+
+            if jsonData and not fast:
+                self.intents.record(instruction, jsonData.get("type"))
+
+            if not jsonData:
+                self._cancel_work(early_work)
+                self.speech.say(COULD_NOT_PROCESS)
+                self.speech.wait()
+                return "Could not process the request."
 
             type = jsonData.get("type")
 
@@ -66,11 +371,9 @@ class RouterAgent:
             response_text = jsonData.get("response_text")
             
             if type == "instant_response":
-                if response_text:
-                    self.tts_service.speak(response_text)
+                # Already queued for speech
+                pass
             elif type == "tool_invocation":
-                threading.Thread(target=self.tts_service.speak, args=(response_text,), daemon=True).start()
-
                 # Expect either a direct instruction for the task agent, or explicit tool_name/args
                 tool_name = jsonData.get("tool_name")
                 tool_args = jsonData.get("tool_args")
@@ -87,48 +390,61 @@ class RouterAgent:
                     # No specific tool_name — treat as a natural language task for the TaskAgent
                     instruction = jsonData.get("instruction") or jsonData.get("user_request") or full_text
 
+                progress("Working on it...")
                 try:
-                    result = self.task_agent.execute_task(instruction)
+                    if early_work is not None:
+                        result = early_work.future.result()
+                    else:
+                        result = self.task_agent.execute_task(instruction, cancel_event=cancel_event)
+                    check_cancelled(cancel_event)
                     # TaskAgent returns final text describing completion; speak it and return
                     if isinstance(result, str):
                         response_text = result
-                        self.tts_service.speak(response_text)
                     else:
                         # If TaskAgent returns structured data, stringify for TTS/display
                         response_text = json.dumps(result)
-                        self.tts_service.speak(response_text)
+                    self.speech.say(response_text)
+                except TurnCancelled:
+                    raise
                 except Exception as e:
                     response_text = f"Error executing task: {e}"
                     print(response_text)
-                    self.tts_service.speak(response_text)
+                    self.speech.say(response_text)
 
             elif type == "advanced_reasoning":
-                threading.Thread(target=self.tts_service.speak, args=(response_text,), daemon=True).start()
-                
                 reasoning_query = full_text
+                progress("Reasoning...")
                 try:
-                    reasoning_result = self.reasoner.reason(reasoning_query)
+                    if early_work is not None:
+                        reasoning_result = early_work.future.result()
+                    else:
+                        reasoning_result = self.reasoner.reason(reasoning_query, cancel_event)
+                    check_cancelled(cancel_event)
                     # reasoning_result expected: { voice_summary, display_content, raw_response }
                     voice = reasoning_result.get("voice_summary") or "I've completed the analysis."
                     display = reasoning_result.get("display_content") or reasoning_result.get("raw_response", "")
                     # Speak concise voice summary and return the display content
-                    # self.tts_service.speak(voice)
-                    threading.Thread(target=self.tts_service.speak, args=(voice,), daemon=True).start()
+                    self.speech.say(voice)
                     self.set_content_area_ui(display)
+                except TurnCancelled:
+                    raise
                 except Exception as e:
                     response_text = f"Error during advanced reasoning: {e}"
                     print(response_text)
-                    self.tts_service.speak(response_text)
+                    self.speech.say(response_text)
             else:
                 raise Exception(f"Unknown response type: {type}")
             
+            self.speech.wait()
             return response_text
 
+        except TurnCancelled:
+            self._cancel_work(early_work)
+            self.speech.cancel()
+            raise
         except Exception as e:
-            threading.Thread(target=self.tts_service.speak, args=("I’m sorry, could you repeat that?",), daemon=True).start()
+            self._cancel_work(early_work)
+            self.speech.say(PLEASE_REPEAT)
             print(f"Error in RouterAgent: {e}")
+            self.speech.wait()
             return None
-
-        
-    
-    
\ No newline at end of file
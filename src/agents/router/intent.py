@@ -0,0 +1,309 @@
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.lib.config_manager import ConfigManager
+from src.lib.system_info import SystemInfo
+from src.lib.text import normalize_text
+
+DECISION_LOG = ConfigManager.CONFIG_FOLDER / "router_decisions.jsonl"
+
+# Utterances are only written to the decision log when opted in
+LOG_DECISIONS = os.environ.get("ROUTER_LOG_DECISIONS", "").lower() in ("1", "true", "yes")
+
+# Spoken instead of the router's own acknowledgement when the model skips it
+ACKNOWLEDGEMENTS = {
+    "tool_invocation": "On it.",
+    "advanced_reasoning": "Let me think about that.",
+}
+
+# Routes the model may take without the LLM. Tool turns run shell commands,
+# so a guess is never enough for them; the LLM always confirms those.
+MODEL_ROUTES = {"advanced_reasoning"}
+
+
+@dataclass
+class IntentPrediction:
+    type: str
+    confidence: float
+    # "rule" or "model"
+    source: str
+    # Set when the answer is known locally (rules) or a stock phrase is used
+    response_text: Optional[str] = None
+
+    def as_decision(self) -> Dict[str, str]:
+        """The prediction in the router's decision format."""
+        return {"type": self.type, "response_text": self.response_text or ""}
+
+
+def _time_answer() -> str:
+    return f"It's {datetime.now().strftime('%I:%M %p').lstrip('0')}."
+
+def _date_answer() -> str:
+    return f"Today is {datetime.now().strftime('%A, %B %d, %Y')}."
+
+def _os_answer() -> str:
+    return f"You're running {SystemInfo.USER_OS}."
+
+def _cwd_answer() -> str:
+    return f"The current directory is {SystemInfo.CURRENT_WORKING_DIRECTORY}."
+
+
+# Matched against normalized text; anchored so "what time does the
+# store close" or "set a timer" fall through to the model/LLM
+INTENT_RULES: List[Tuple[re.Pattern, Callable[[], str]]] = [
+    (re.compile(r"^(?:hey |ok |okay )?(?:what time is it|what's the time|what is the time|tell me the time|current time)(?: now| right now)?$"), _time_answer),
+    (re.compile(r"^(?:hey |ok |okay )?(?:what's the date|what is the date|what's today's date|what is today's date|what day is it|what day is today|today's date)(?: today)?$"), _date_answer),
+    (re.compile(r"^(?:what|which) (?:os|operating system) (?:am i (?:running|using|on)|is this|is running|do i have)$"), _os_answer),
+    (re.compile(r"^(?:what|which) (?:directory|folder) am i in$|^(?:what's|what is) the current (?:directory|folder|working directory)$"), _cwd_answer),
+]
+
+
+def ngrams(text: str) -> List[str]:
+    """Word unigrams and bigrams of normalized text."""
+    words = normalize_text(text).split()
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class NgramIntentModel:
+    """
+    Multinomial naive Bayes over word uni/bigrams with TF-IDF-style
+    sublinear counts. Small enough to train at startup from the decision
+    log and to update online as new router decisions arrive; prediction
+    is a handful of dict lookups.
+    """
+    def __init__(self, alpha: float = 0.5):
+        self.alpha = alpha
+        self.class_docs: Counter = Counter()
+        self.class_totals: Dict[str, float] = defaultdict(float)
+        self.weights: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.vocab: set = set()
+
+    @property
+    def samples(self) -> int:
+        return sum(self.class_docs.values())
+
+    @staticmethod
+    def _features(text: str) -> Dict[str, float]:
+        return {gram: 1.0 + math.log(count) for gram, count in Counter(ngrams(text)).items()}
+
+    def partial_fit(self, text: str, label: str) -> None:
+        self.class_docs[label] += 1
+        for gram, weight in self._features(text).items():
+            self.weights[label][gram] += weight
+            self.class_totals[label] += weight
+            self.vocab.add(gram)
+
+    def fit(self, samples: Iterable[Tuple[str, str]]) -> "NgramIntentModel":
+        for text, label in samples:
+            self.partial_fit(text, label)
+        return self
+
+    def predict(self, text: str) -> Tuple[Optional[str], float]:
+        """
+        Returns:
+            (label, posterior probability), or (None, 0.0) if untrained
+        """
+        if not self.class_docs:
+            return None, 0.0
+
+        features = self._features(text)
+        total_docs = self.samples
+        vocab_size = len(self.vocab) + 1
+        scores = {}
+        for label, docs in self.class_docs.items():
+            denominator = self.class_totals[label] + self.alpha * vocab_size
+            score = math.log(docs / total_docs)
+            for gram, weight in features.items():
+                score += weight * math.log((self.weights[label].get(gram, 0.0) + self.alpha) / denominator)
+            scores[label] = score
+
+        best = max(scores, key=scores.get)
+        peak = scores[best]
+        norm = sum(math.exp(score - peak) for score in scores.values())
+        return best, 1.0 / norm
+
+
+def _model_route(model: NgramIntentModel, text: str, min_confidence: float) -> Optional[IntentPrediction]:
+    label, confidence = model.predict(text)
+    if label in MODEL_ROUTES and confidence >= min_confidence:
+        return IntentPrediction(label, confidence, "model", ACKNOWLEDGEMENTS[label])
+    return None
+
+
+class DecisionLog:
+    """
+    Append-only jsonl of router decisions, used as training data. Only the
+    newest `max_records` are kept.
+    """
+    def __init__(self, path: Path = DECISION_LOG, max_records: int = 5000):
+        self.path = Path(path)
+        self.max_records = max_records
+        self._lock = threading.Lock()
+        # Counted on the first append
+        self._records: Optional[int] = None
+
+    def append(self, text: str, type: str, source: str) -> None:
+        record = {"text": text, "type": type, "source": source, "ts": time.time()}
+        try:
+            with self._lock:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                if self._records is None:
+                    self._records = self._count()
+                with open(self.path, "a") as f:
+                    f.write(json.dumps(record) + "\n")
+                self._records += 1
+                # Trim with 10% slack so the file is not rewritten on every append
+                if self._records > self.max_records * 1.1:
+                    self._trim()
+        except OSError as e:
+            print(f"Failed to log router decision: {e}")
+
+    def _count(self) -> int:
+        if not self.path.exists():
+            return 0
+        with open(self.path) as f:
+            return sum(1 for _ in f)
+
+    def _trim(self) -> None:
+        with open(self.path) as f:
+            lines = f.readlines()[-self.max_records:]
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            f.writelines(lines)
+        tmp.replace(self.path)
+        self._records = len(lines)
+
+    def read(self, source: Optional[str] = "llm") -> List[Tuple[str, str]]:
+        """(text, type) pairs, by default only those labelled by the LLM."""
+        if not self.path.exists():
+            return []
+
+        samples = []
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if source is None or record.get("source") == source:
+                    samples.append((record["text"], record["type"]))
+        return samples
+
+
+class IntentClassifier:
+    """
+    In-process fast path in front of the router LLM.
+
+    Trivial intents (time, date, OS, working directory) are answered by
+    rules. Otherwise an n-gram model trained on logged LLM decisions
+    predicts the route; `advanced_reasoning` is taken locally when it is
+    confident, since that path only needs a stock acknowledgement. Tool
+    turns and anything else return None and go to the LLM.
+
+    `classify` runs on the GUI thread while `record` runs on the turn
+    thread, so the model is guarded by a lock.
+    """
+    def __init__(
+        self,
+        log: Optional[DecisionLog] = None,
+        min_confidence: float = 0.95,
+        min_samples: int = 50,
+        log_decisions: bool = LOG_DECISIONS
+    ):
+        """
+        Args:
+            log: Where router decisions are recorded and training data comes from.
+            min_confidence: Posterior the model needs to skip the LLM.
+            min_samples: Logged decisions needed before the model is used at all.
+            log_decisions: Write utterances to `log` (ROUTER_LOG_DECISIONS);
+                when off, the model still learns for this session only.
+        """
+        self.log = log or DecisionLog()
+        self.min_confidence = min_confidence
+        self.min_samples = min_samples
+        self.log_decisions = log_decisions
+        self.model = NgramIntentModel().fit(self.log.read())
+        self._lock = threading.Lock()
+
+    def classify(self, text: str) -> Optional[IntentPrediction]:
+        normalized = normalize_text(text)
+
+        for pattern, answer in INTENT_RULES:
+            if pattern.match(normalized):
+                return IntentPrediction("instant_response", 1.0, "rule", answer())
+
+        with self._lock:
+            if self.model.samples < self.min_samples:
+                return None
+            return _model_route(self.model, text, self.min_confidence)
+
+    def record(self, text: str, type: str) -> None:
+        """Learn from a decision made by the LLM, and log it if opted in."""
+        if self.log_decisions:
+            self.log.append(text, type, "llm")
+        with self._lock:
+            self.model.partial_fit(text, type)
+
+
+def intent_report(
+    samples: List[Tuple[str, str]],
+    holdout: float = 0.2,
+    min_confidence: float = 0.95
+) -> Dict[str, Dict[str, float]]:
+    """
+    Precision/recall of the fast path against recorded LLM decisions.
+
+    The model is trained on the oldest samples and scored on the newest
+    `holdout` fraction, routed exactly as `IntentClassifier.classify`
+    would. Utterances deferred to the LLM lower recall but not precision.
+
+    Returns:
+        {label: {"precision", "recall", "support"}} plus an "overall" entry
+        with accuracy-when-answered and the fraction answered locally
+    """
+    split = int(len(samples) * (1 - holdout))
+    train, test = samples[:split], samples[split:]
+    model = NgramIntentModel().fit(train)
+
+    true_pos: Counter = Counter()
+    predicted: Counter = Counter()
+    support: Counter = Counter()
+    answered = correct = 0
+
+    for text, label in test:
+        support[label] += 1
+        if any(pattern.match(normalize_text(text)) for pattern, _ in INTENT_RULES):
+            guess = "instant_response"
+        else:
+            prediction = _model_route(model, text, min_confidence)
+            if prediction is None:
+                continue
+            guess = prediction.type
+        answered += 1
+        predicted[guess] += 1
+        if guess == label:
+            true_pos[guess] += 1
+            correct += 1
+
+    report = {}
+    for label in sorted(set(support) | set(predicted)):
+        report[label] = {
+            "precision": true_pos[label] / predicted[label] if predicted[label] else 0.0,
+            "recall": true_pos[label] / support[label] if support[label] else 0.0,
+            "support": support[label],
+        }
+    report["overall"] = {
+        "precision": correct / answered if answered else 0.0,
+        "recall": answered / len(test) if test else 0.0,
+        "support": len(test),
+    }
+    return report
@@ -0,0 +1,117 @@
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Coroutine, Dict, Optional
+
+from src.lib.text import normalize_text
+
+Decision = Dict[str, Any]
+Submit = Callable[[Coroutine[Any, Any, Any]], Future]
+
+
+@dataclass
+class SpeculationStats:
+    started: int = 0
+    reused: int = 0
+    discarded: int = 0
+
+
+class SpeculativeRouter:
+    """
+    Starts the router LLM call on a stable interim transcript so its latency
+    overlaps with end-of-turn detection.
+
+    An interim transcript counts as stable once the same normalized text has
+    been seen on `stable_updates` consecutive updates (see `is_stable`); the
+    caller may also `speculate` directly, e.g. on an EagerEndOfTurn event. When the
+    final transcript arrives, `claim`/`resolve` reuse the speculative decision if
+    the text matches and discards it otherwise.
+
+    Only the side-effect-free routing decision is speculated; nothing is
+    spoken or executed until the turn is final. Decisions run as coroutines
+    on an event loop (`submit`, e.g. AsyncQtThread.submit), so cancelling a
+    speculation really aborts the in-flight request.
+    """
+    def __init__(self, submit: Submit, stable_updates: int = 2):
+        self.submit = submit
+        self.stable_updates = stable_updates
+        self.stats = SpeculationStats()
+        self._future: Optional[Future] = None
+        self._key: Optional[str] = None
+        self._last_key: Optional[str] = None
+        self._seen = 0
+
+    def is_stable(self, text: str) -> bool:
+        """
+        Feed an interim transcript. True once it has stabilised and is not
+        already being speculated on.
+        """
+        key = normalize_text(text)
+        if not key:
+            return False
+
+        if key == self._last_key:
+            self._seen += 1
+        else:
+            self._last_key = key
+            self._seen = 1
+
+        return self._seen >= self.stable_updates and key != self._key
+
+    def speculate(self, text: str, decide: Callable[[str], Awaitable[Decision]]) -> None:
+        """Start the coroutine `decide(text)` on the loop, replacing any older guess."""
+        key = normalize_text(text)
+        if not key or key == self._key:
+            return
+
+        self.cancel()
+        print(f"🔮 Speculating on: {text}")
+        self._key = key
+        self._future = self.submit(decide(text))
+        self.stats.started += 1
+
+    def claim(self, final_text: str) -> Optional[Future]:
+        """
+        Hand over the speculation for `final_text` without waiting on it.
+        Returns None if there is no usable speculation and the caller has to
+        route the final text itself.
+        """
+        future, key = self._future, self._key
+        self._future = None
+        self._key = None
+        self._last_key = None
+        self._seen = 0
+
+        if future is None:
+            return None
+
+        if key != normalize_text(final_text):
+            future.cancel()
+            self.stats.discarded += 1
+            return None
+
+        self.stats.reused += 1
+        print(f"🔮 Reusing speculative decision ({self.stats.reused}/{self.stats.started})")
+        return future
+
+    def resolve(self, final_text: str) -> Optional[Decision]:
+        """Like `claim`, but waits for the speculative decision."""
+        future = self.claim(final_text)
+        if future is None:
+            return None
+
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Speculative routing failed: {e}")
+            return None
+
+    def cancel(self) -> None:
+        """Drop the in-flight speculation, cancelling its task on the loop."""
+        if self._future is not None:
+            self._future.cancel()
+            self.stats.discarded += 1
+        self._future = None
+        self._key = None
+
+    def shutdown(self) -> None:
+        self.cancel()
@@ -0,0 +1,64 @@
+import json
+import re
+from typing import List, Optional
+
+from src.lib.text import pop_sentences
+
+_TYPE = re.compile(r'"type"\s*:\s*"((?:[^"\\]|\\.)*)"')
+_RESPONSE_TEXT = re.compile(r'"response_text"\s*:\s*"((?:[^"\\]|\\.)*)(")?')
+_INCOMPLETE_UNICODE = re.compile(r"\\u[0-9a-fA-F]{0,3}$")
+
+
+def _decode(raw: str) -> str:
+    """Decode the body of a JSON string, ignoring a trailing partial escape."""
+    raw = _INCOMPLETE_UNICODE.sub("", raw)
+    try:
+        return json.loads(f'"{raw}"')
+    except json.JSONDecodeError:
+        return raw
+
+
+class RouterStreamParser:
+    """
+    Incrementally parses the router's streamed JSON
+    ({"type": ..., "response_text": ...}).
+
+    `type` becomes available as soon as its string value is closed, and
+    `feed` hands back each complete sentence of `response_text` while the
+    rest of the object is still being generated, so speech and dispatch can
+    start before the closing brace.
+    """
+    def __init__(self):
+        self.buffer = ""
+        self.type: Optional[str] = None
+        self.response_text = ""
+        self._text_closed = False
+        self._pending = ""
+
+    def feed(self, delta: str) -> List[str]:
+        """Add streamed text; returns newly completed response sentences."""
+        self.buffer += delta
+
+        if self.type is None:
+            match = _TYPE.search(self.buffer)
+            if match:
+                self.type = _decode(match.group(1))
+
+        if not self._text_closed:
+            match = _RESPONSE_TEXT.search(self.buffer)
+            if match:
+                text = _decode(match.group(1))
+                self._pending += text[len(self.response_text):]
+                self.response_text = text
+                self._text_closed = match.group(2) is not None
+
+        sentences, self._pending = pop_sentences(self._pending)
+        if self._text_closed and self._pending.strip():
+            sentences.append(self._pending.strip())
+            self._pending = ""
+        return sentences
+
+    def remaining_text(self) -> str:
+        """Unspoken tail of `response_text` (e.g. if the stream was cut short)."""
+        text, self._pending = self._pending.strip(), ""
+        return text
@@ -0,0 +1,3 @@
+from .engine import SummarizerAgent
+
+__all__ = ["SummarizerAgent"]
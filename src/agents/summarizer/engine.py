@@ -0,0 +1,47 @@
+import jinja2
+import json
+from typing import Optional
+from pydantic import BaseModel
+
+from src.lib.prepared_prompt import PreparedPrompt
+from src.llm import LLMProvider
+
+env = jinja2.Environment(loader=jinja2.PackageLoader("src.agents.summarizer", ""))
+template = env.get_template("system.j2")
+
+class SummaryOutput(BaseModel):
+    summary: str
+
+class SummarizerAgent:
+    """
+    Folds old conversation turns into a short rolling summary, so the
+    context sent with each turn stays within budget.
+    """
+
+    def __init__(self, provider: Optional[str] = None, model: Optional[str] = None):
+        """
+        Args:
+            provider: LLM provider (LLM_PROVIDER by default, e.g. "replay").
+            model: Model of that provider.
+        """
+        self.llm = LLMProvider(provider, model)
+        self.prompt = PreparedPrompt(template)
+
+    @property
+    def system_prompt(self) -> str:
+        return self.prompt.render()
+
+    def summarize(self, previous_summary: str, transcript: str) -> str:
+        print("🗜️ Summarizing older conversation...")
+
+        response = self.llm.model.inference(
+            contents=f"Current summary:\n{previous_summary or '(none)'}\n\nTranscript:\n{transcript}",
+            system_prompt=self.system_prompt,
+            json_mode=True,
+            response_schema=SummaryOutput
+        )
+
+        if not response.text_content:
+            raise Exception("LLM returned an empty summary")
+
+        return json.loads(response.text_content).get("summary", "")
@@ -1,9 +1,16 @@
+import contextlib
 import jinja2
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
 from src.lib import SystemInfo, ChatHistory
+from src.lib.cancellation import check_cancelled
+from src.lib.prepared_prompt import PreparedPrompt
 from src.llm import LLMProvider
 from src.tools import execute_tool
+from src.tools.registry import TOOL_REGISTRY
 
 env = jinja2.Environment(loader=jinja2.PackageLoader("src.agents.task", ""))
 template = env.get_template("system.j2")
@@ -14,20 +21,31 @@ class TaskAgent:
     Follows: Analyze → Plan → Act → Verify
     """
     
-    def __init__(self):
-        self.llm = LLMProvider("gemini")
+    def __init__(self, provider: Optional[str] = None, model: Optional[str] = None):
+        """
+        Args:
+            provider: LLM provider (LLM_PROVIDER by default, e.g. "replay").
+            model: Model of that provider.
+        """
+        self.llm = LLMProvider(provider, model)
         self.max_steps = 15
+        # Parallel function calls of one model turn
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="task-tools")
+        self._slots: Dict[str, Any] = {}
+        self._slots_lock = threading.Lock()
+        self.prompt = PreparedPrompt(template, lambda: dict(
+            user_os= SystemInfo.USER_OS,
+            current_dir= SystemInfo.CURRENT_WORKING_DIRECTORY,
+        ))
     
     @property
     def system_prompt(self) -> str:
-        return template.render(
-            user_os= SystemInfo.USER_OS,
-            current_dir= SystemInfo.CURRENT_WORKING_DIRECTORY,
-        )
+        return self.prompt.render()
     
-    def execute_task(self, user_request: str) -> str:
+    def execute_task(self, user_request: str, cancel_event: Optional[threading.Event] = None) -> str:
         """
         Execute a task using ReAct loop.
+        Raises TurnCancelled between steps once `cancel_event` is set.
         """
         
         print(f"\n🔹 STARTED TASK: {user_request}\n")
@@ -38,8 +56,12 @@ class TaskAgent:
         # add user query to history
         chat_history.add_message("user", user_request)
         
+        # Rendered once for the whole loop
+        system_prompt = self.system_prompt
+
         step = 0
         while step < self.max_steps:
+            check_cancelled(cancel_event)
             step += 1
             
             # === ANALYZE ===
@@ -52,41 +74,44 @@ class TaskAgent:
 
             response = self.llm.model.inference(
                 contents = contents,
-                system_prompt = self.system_prompt
+                system_prompt = system_prompt
             )
 
             
             # === PATH 1: AGENT WANTS TO USE A TOOL ===
 
-            if response.tool_call:
-                tool = response.tool_call
-
-                tool_name = str(tool.get("name"))
-                tool_args = tool.get("args", {})
+            if response.tool_calls:
+                calls = [
+                    (str(tool.get("name")), tool.get("args") or {})
+                    for tool in response.tool_calls
+                ]
 
                 # === PLAN ===
-                print(f"📋 Plan: Use tool '{tool_name}' with args {tool_args}")
+                for tool_name, tool_args in calls:
+                    print(f"📋 Plan: Use tool '{tool_name}' with args {tool_args}")
 
                 # === ACT ===
-                print(f"⚙️  Step {step}: Executing {tool_name}...")
+                check_cancelled(cancel_event)
+                print(f"⚙️  Step {step}: Executing {', '.join(name for name, _ in calls)}...")
 
-                try:
-                    result_data = execute_tool(tool_name, tool_args)
-                except Exception as e:
-                    result_data = {"error": str(e)}
+                results = self._execute_tools(calls, cancel_event)
 
                 # === VERIFY ===
-                print(f"✓ Result: {result_data}")
-
-                chat_history.add_message("model", {
-                    "name": tool_name,
-                    "args": tool_args
-                })
-
-                chat_history.add_message("user", {
-                    "name": tool_name,
-                    "response": result_data
-                })
+                for result_data in results:
+                    print(f"✓ Result: {result_data}")
+
+                # All calls of the turn first, then all their responses
+                for tool_name, tool_args in calls:
+                    chat_history.add_message("model", {
+                        "name": tool_name,
+                        "args": tool_args
+                    })
+
+                for (tool_name, _), result_data in zip(calls, results):
+                    chat_history.add_message("user", {
+                        "name": tool_name,
+                        "response": result_data
+                    })
 
             elif response.text_content:
                 final_text = response.text_content
@@ -95,4 +120,46 @@ class TaskAgent:
             else:
                 return "Error: Unexpected response format from model"
         return f"⚠️ Task exceeded max steps ({self.max_steps}). Stopping."
+
+    def _execute_tools(
+        self,
+        calls: List[Tuple[str, Dict[str, Any]]],
+        cancel_event: Optional[threading.Event] = None
+    ) -> List[Any]:
+        """
+        Run the tool calls of one model turn. Independent calls run
+        concurrently on the worker pool, each tool limited to its
+        `max_concurrency`; results come back in call order.
+        """
+        if len(calls) == 1:
+            return [self._run_tool(*calls[0], cancel_event)]
+
+        futures = [
+            self.executor.submit(self._run_tool, tool_name, tool_args, cancel_event)
+            for tool_name, tool_args in calls
+        ]
+        return [future.result() for future in futures]
+
+    def _run_tool(
+        self,
+        tool_name: str,
+        tool_args: Dict[str, Any],
+        cancel_event: Optional[threading.Event] = None
+    ) -> Any:
+        with self._tool_slot(tool_name):
+            check_cancelled(cancel_event)
+            try:
+                return execute_tool(tool_name, tool_args)
+            except Exception as e:
+                return {"error": str(e)}
+
+    def _tool_slot(self, tool_name: str):
+        with self._slots_lock:
+            slot = self._slots.get(tool_name)
+            if slot is None:
+                tool = TOOL_REGISTRY.get(tool_name)
+                limit = tool.max_concurrency if tool else None
+                slot = threading.BoundedSemaphore(limit) if limit else contextlib.nullcontext()
+                self._slots[tool_name] = slot
+            return slot
     
@@ -1,13 +1,27 @@
 from .async_qt import AsyncQtThread
 from .mic import MicThread
+from .barge_in import BargeInDetector
+from .ring_buffer import AudioRingBuffer, RingReader
 from .conversation_history import ConversationHistory
+from .context_window import ContextWindow
 from .chat_history import ChatHistory
 from .system_info import SystemInfo
+from .turn_taking import TurnTakingEngine
+from .cancellation import TurnCancelled
+from .turn_pipeline import TurnThread, TurnRequest
 
 __all__ = [
     "AsyncQtThread",
     "MicThread",
+    "BargeInDetector",
+    "AudioRingBuffer",
+    "RingReader",
     "ConversationHistory",
+    "ContextWindow",
     "ChatHistory",
-    "SystemInfo"
+    "SystemInfo",
+    "TurnTakingEngine",
+    "TurnCancelled",
+    "TurnThread",
+    "TurnRequest"
 ]
\ No newline at end of file
@@ -1,4 +1,6 @@
 from PyQt6.QtCore import QThread, QObject, pyqtSignal
+from concurrent.futures import Future
+from typing import Any, Coroutine
 import asyncio
 
 class AsyncQtWorker(QObject):
@@ -64,6 +66,13 @@ class AsyncQtThread:
 
     def start(self):
         self.thread.start()
+
+    def submit(self, coro: Coroutine[Any, Any, Any]) -> Future:
+        """
+        Schedule another coroutine on this thread's event loop from any
+        thread. Cancelling the returned future cancels the task on the loop.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
     
     def stop(self):
         if self.thread.isRunning():
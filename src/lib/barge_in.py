@@ -0,0 +1,116 @@
+from collections import deque
+from typing import Callable
+
+import numpy as np
+
+from src.lib.vad import VoiceActivityDetector
+
+
+class BargeInDetector:
+    """
+    Detects the user starting to talk over the assistant.
+
+    The mic keeps capturing while audio plays, so it hears both the user
+    and the assistant's own voice coming back from the speakers. Every
+    20 ms frame has to pass the spectral VAD *and* an echo gate: its energy
+    must exceed `echo_margin` times the expected echo, i.e. the recent
+    playback energy (`echo_level`) scaled by a speaker-to-mic coupling
+    learned from frames the VAD marks as non-speech. `onset_frames`
+    consecutive gated frames (60 ms by default) count as barge-in.
+    """
+    def __init__(
+        self,
+        echo_level: Callable[[], float],
+        sample_rate: int = 16000,
+        frame_ms: int = 20,
+        energy_threshold: float = 0.01,
+        onset_frames: int = 3,
+        echo_margin: float = 4.0,
+        coupling: float = 0.5,
+        coupling_adapt: float = 0.1,
+        echo_window: int = 8,
+    ):
+        """
+        Args:
+            echo_level: Returns the mean-square level currently being played.
+            sample_rate: Sample rate of the mic audio.
+            frame_ms: Analysis frame length in milliseconds.
+            energy_threshold: Absolute RMS below which a frame is never speech.
+            onset_frames: Consecutive gated speech frames that trigger barge-in.
+            echo_margin: How far above the expected echo speech must be.
+            coupling: Initial speaker-to-mic energy ratio.
+            coupling_adapt: Rate at which the coupling follows a falling ratio.
+            echo_window: Playback levels (one per `process` call) searched for
+                the echo reference, covering the output-to-mic delay.
+        """
+        self.echo_level = echo_level
+        self.frame_len = sample_rate * frame_ms // 1000
+        self.onset_frames = onset_frames
+        self.echo_margin = echo_margin
+        self.coupling = coupling
+        self.coupling_adapt = coupling_adapt
+
+        self.vad = VoiceActivityDetector(
+            sample_rate=sample_rate,
+            frame_ms=frame_ms,
+            energy_threshold=energy_threshold,
+            onset_frames=1,
+            hangover_frames=0,
+        )
+        self._stage = np.zeros(self.frame_len, dtype=np.float32)
+        self._levels: deque = deque(maxlen=echo_window)
+        self.reset()
+
+    def reset(self) -> None:
+        """Start watching a new response; the learned coupling is kept."""
+        self.vad.reset()
+        self._fill = 0
+        self._run = 0
+        self._levels.clear()
+
+    def process(self, chunk: np.ndarray) -> bool:
+        """Feed mic audio; returns True once the user is talking over playback."""
+        self._levels.append(self.echo_level())
+        reference = max(self._levels)
+
+        offset = 0
+        while offset < len(chunk):
+            take = min(self.frame_len - self._fill, len(chunk) - offset)
+            self._stage[self._fill:self._fill + take] = chunk[offset:offset + take]
+            self._fill += take
+            offset += take
+            if self._fill < self.frame_len:
+                break
+            self._fill = 0
+
+            if self._frame(self._stage, reference):
+                return True
+        return False
+
+    def _frame(self, frame: np.ndarray, reference: float) -> bool:
+        energy = float(np.mean(np.square(frame)))
+        decisions = self.vad.process(frame)
+        speech = bool(decisions[-1]) if len(decisions) else False
+
+        if reference <= 1e-8:
+            # Nothing playing, nothing to echo
+            self._run = self._run + 1 if speech else 0
+            return self._run >= self.onset_frames
+
+        above_echo = energy > self.echo_margin * self.coupling * reference
+        if speech and above_echo:
+            self._run += 1
+            return self._run >= self.onset_frames
+
+        self._run = 0
+        if speech:
+            # Could be the user talking under the echo; learning from it
+            # would raise the gate until real barge-ins no longer pass
+            return False
+
+        # Our own voice leaking back: learn how loud it is at the mic,
+        # following rises quickly and falls slowly
+        ratio = energy / reference
+        rate = 0.5 if ratio > self.coupling else self.coupling_adapt
+        self.coupling += rate * (ratio - self.coupling)
+        return False
@@ -0,0 +1,26 @@
+import threading
+from typing import Optional
+
+
+class TurnCancelled(Exception):
+    """Raised inside the turn pipeline when the current turn was cancelled."""
+
+
+class LinkedCancelEvent(threading.Event):
+    """
+    Cancel event for a piece of work inside a turn: reads as set once it is
+    set itself or once `parent` (the turn's event) is, so the work can be
+    cancelled on its own or together with the whole turn.
+    """
+    def __init__(self, parent: Optional[threading.Event] = None):
+        super().__init__()
+        self.parent = parent
+
+    def is_set(self) -> bool:
+        return super().is_set() or (self.parent is not None and self.parent.is_set())
+
+
+def check_cancelled(cancel_event: Optional[threading.Event]) -> None:
+    """Raise TurnCancelled if `cancel_event` is set. No-op for None."""
+    if cancel_event is not None and cancel_event.is_set():
+        raise TurnCancelled()
@@ -0,0 +1,203 @@
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English)."""
+    return max(1, (len(text) + 3) // 4)
+
+
+@dataclass
+class _Entry:
+    role: str
+    content: str
+    line: str
+    tokens: int
+
+
+class ContextWindow:
+    """
+    Token-aware conversation context.
+
+    Messages are kept with their token counts and the formatted context is
+    extended in place as they arrive instead of being rebuilt every turn.
+    Once the window exceeds `token_budget`, the oldest exchanges are folded
+    into a rolling summary by `summarize(previous_summary, transcript)` on a
+    background thread; until that returns they stay in the context as is.
+    Without a summarizer the oldest messages are simply dropped.
+
+    Drop-in for ConversationHistory (add_user_message, add_assistant_message,
+    get_messages, get_formatted_context, clear).
+    """
+    def __init__(
+        self,
+        token_budget: int = 2000,
+        keep_recent: int = 4,
+        summarize: Optional[Callable[[str, str], str]] = None,
+        count_tokens: Callable[[str], int] = estimate_tokens
+    ):
+        """
+        Args:
+            token_budget: Tokens the whole context (summary included) may use.
+            keep_recent: Newest messages that are never folded away.
+            summarize: Returns an updated summary given the previous one and
+                a transcript of the messages being folded in.
+            count_tokens: Token counter for a piece of text.
+        """
+        self.token_budget = token_budget
+        self.keep_recent = keep_recent
+        self.summarize = summarize
+        self.count_tokens = count_tokens
+
+        self.summary = ""
+        self._summary_line = ""
+        self._summary_tokens = 0
+        self._folding: List[_Entry] = []
+        self._folding_tokens = 0
+        self._recent: Deque[_Entry] = deque()
+        self._recent_tokens = 0
+        self._context: Optional[str] = ""
+        # Trimmed contexts by max_tokens, until the next change
+        self._trimmed: Dict[int, str] = {}
+
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="context-summary") if summarize else None
+        self._fold_future: Optional[Future] = None
+
+    @property
+    def tokens(self) -> int:
+        return self._summary_tokens + self._folding_tokens + self._recent_tokens
+
+    def add_user_message(self, message: str) -> None:
+        self._add("user", message)
+
+    def add_assistant_message(self, message: str) -> None:
+        self._add("model", message)
+
+    def _add(self, role: str, content: str) -> None:
+        line = f"{role.upper()}: {content}\n"
+        entry = _Entry(role, content, line, self.count_tokens(line))
+        with self._lock:
+            self._recent.append(entry)
+            self._recent_tokens += entry.tokens
+            if self._context is not None:
+                self._context += line
+            self._trimmed.clear()
+            self._maybe_fold()
+
+    def _maybe_fold(self) -> None:
+        if self.tokens <= self.token_budget or len(self._recent) <= self.keep_recent:
+            return
+        if self._fold_future is not None:
+            # One fold at a time; the next one starts when it finishes
+            return
+
+        # Fold down to half the budget so this does not run every turn, and
+        # never leave an answer without its question
+        while len(self._recent) > self.keep_recent and (
+            self.tokens - self._folding_tokens > self.token_budget // 2
+            or self._recent[0].role != "user"
+        ):
+            entry = self._recent.popleft()
+            self._recent_tokens -= entry.tokens
+            self._folding.append(entry)
+            self._folding_tokens += entry.tokens
+
+        if not self._folding:
+            return
+
+        if self._executor is None:
+            self._drop_folding()
+            return
+
+        transcript = "".join(entry.line for entry in self._folding)
+        self._fold_future = self._executor.submit(self.summarize, self.summary, transcript)
+        self._fold_future.add_done_callback(self._on_folded)
+
+    def _on_folded(self, future: Future) -> None:
+        with self._lock:
+            if future is not self._fold_future:
+                # Cleared while summarizing
+                return
+            self._fold_future = None
+            try:
+                self._set_summary(future.result())
+            except Exception as e:
+                print(f"Context summarization failed, dropping old messages: {e}")
+            self._drop_folding()
+            self._maybe_fold()
+
+    def _set_summary(self, summary: str) -> None:
+        self.summary = summary.strip()
+        self._summary_line = f"SUMMARY OF EARLIER CONVERSATION: {self.summary}\n" if self.summary else ""
+        self._summary_tokens = self.count_tokens(self._summary_line) if self.summary else 0
+        self._context = None
+        self._trimmed.clear()
+
+    def _drop_folding(self) -> None:
+        self._folding = []
+        self._folding_tokens = 0
+        self._context = None
+        self._trimmed.clear()
+
+    def _entries(self) -> List[_Entry]:
+        return self._folding + list(self._recent)
+
+    def get_messages(self) -> List[Dict[str, str]]:
+        with self._lock:
+            return [{"role": entry.role, "content": entry.content} for entry in self._entries()]
+
+    def get_formatted_context(self, max_tokens: Optional[int] = None) -> str:
+        """
+        The summary followed by the messages, one "ROLE: content" line each.
+
+        Args:
+            max_tokens: Per-agent budget. The summary is kept (if it fits at
+                all) and the oldest messages are left out until the rest
+                fits; the result is reused until the window changes.
+        """
+        with self._lock:
+            if self._context is None:
+                self._context = self._summary_line + "".join(entry.line for entry in self._entries())
+
+            if max_tokens is None or self.tokens <= max_tokens:
+                return self._context
+
+            trimmed = self._trimmed.get(max_tokens)
+            if trimmed is not None:
+                return trimmed
+
+            # The summary stands for everything older, so it goes in first
+            summary = self._summary_line if self._summary_tokens <= max_tokens else ""
+            used = self._summary_tokens if summary else 0
+            lines: List[str] = []
+            for entry in reversed(self._entries()):
+                if used + entry.tokens > max_tokens:
+                    break
+                lines.append(entry.line)
+                used += entry.tokens
+
+            trimmed = summary + "".join(reversed(lines))
+            self._trimmed[max_tokens] = trimmed
+            return trimmed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fold_future = None
+            self._set_summary("")
+            self._drop_folding()
+            self._recent.clear()
+            self._recent_tokens = 0
+            self._context = ""
+            self._trimmed.clear()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._folding) + len(self._recent)
@@ -1,25 +1,43 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 import numpy as np
 import sounddevice as sd
 
 from PyQt6.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
-from scipy.signal import resample_poly
+from src.lib.resampler import StreamingResampler
+from src.lib.ring_buffer import AudioRingBuffer
 from src.lib.silence_detector import SilenceDetector
+from src.lib.barge_in import BargeInDetector
 
 class MicWorker(QObject):
-    volume_signal = pyqtSignal(float)
-    voice_signal = pyqtSignal(np.ndarray)
     silence_signal = pyqtSignal()  # Emitted when silence > threshold
+    barge_in_signal = pyqtSignal()  # Emitted when the user talks over playback
     finished = pyqtSignal()
 
-    def __init__(self, noise_floor=0.02, sensitivity=40, silence_duration_sec=2.0):
+    def __init__(
+        self,
+        audio_buffer: AudioRingBuffer,
+        noise_floor=0.02,
+        silence_duration_sec=2.0,
+        barge_in: Optional[BargeInDetector] = None
+    ):
         super().__init__()
+        # Resampled 16 kHz audio is published here; consumers (STT, the
+        # visualizer, ...) read it through their own RingReader.
+        self.audio_buffer = audio_buffer
         self.noise_floor = noise_floor
-        self.sensitivity = sensitivity
         self.silence_duration_sec = silence_duration_sec
         self.running = False
+        # Half-duplex gate: while set, the stream stays open but captured
+        # audio is discarded (e.g. while TTS is playing).
+        self.gated = False
+        self._resume_pending = False
+        # Full-duplex alternative to the gate: audio keeps flowing while the
+        # assistant speaks, but only the barge-in detector looks at it
+        self.barge_in = barge_in
+        self.monitoring = False
         self.sample_rate = self.get_sample_rate()
+        self.resampler = StreamingResampler(self.sample_rate, 16000, max_block=512)
         self.silence_detector = SilenceDetector(
             silence_duration_sec=silence_duration_sec,
             rms_threshold=noise_floor
@@ -39,8 +57,10 @@ class MicWorker(QObject):
             # Fallback to a common sample rate
             return 16000
 
-    def resample_audio(self, indata, to=16000) -> np.ndarray:
-        return resample_poly(indata[:, 0], to, self.sample_rate)
+    def resample_audio(self, indata) -> np.ndarray:
+        # Returns a view into the resampler's preallocated output buffer,
+        # valid until the next callback.
+        return self.resampler.process(indata[:, 0])
 
     def _on_silence(self):
         """Called by SilenceDetector when silence is detected. Emit Qt signal."""
@@ -49,23 +69,24 @@ class MicWorker(QObject):
     @pyqtSlot()
     def run(self):
         self.running = True
+        self.resampler.reset()
+        silence_reader = self.audio_buffer.reader()
 
         def callback(indata: np.ndarray, frames: int, time, status):
             if not self.running:
                 return
 
-            vol = float(np.sqrt(np.mean(indata ** 2)))
-            if vol < self.noise_floor:
-                vol = 0.0
-            vol = min(1.0, vol * self.sensitivity)
-
-            resampled = self.resample_audio(indata)
+            if self.gated:
+                self._resume_pending = True
+                return
 
-            # Check for silence (for turn-taking/instruction boundaries)
-            self.silence_detector.process_chunk(resampled)
+            if self._resume_pending:
+                # Don't filter across the muted gap
+                self.resampler.reset()
+                self._resume_pending = False
 
-            self.volume_signal.emit(vol)
-            self.voice_signal.emit(resampled)
+            # Real-time path: resample into the ring and return
+            self.audio_buffer.write(self.resample_audio(indata))
 
         try:
             # The stream lives entirely inside this thread
@@ -75,7 +96,40 @@ class MicWorker(QObject):
                 blocksize=512,
                 callback=callback
             ):
+                was_gated = False
+                was_monitoring = False
                 while self.running:
+                    if self.monitoring and self.barge_in is not None:
+                        if not was_monitoring:
+                            self.silence_detector.reset()
+                            self.barge_in.reset()
+                            silence_reader.skip_to_latest()
+                            was_monitoring = True
+                        chunk = silence_reader.read()
+                        if len(chunk) and self.barge_in.process(chunk):
+                            # Once per response; main decides what happens next
+                            self.monitoring = False
+                            self.barge_in_signal.emit()
+                        sd.sleep(10)
+                        continue
+                    if was_monitoring:
+                        # Listening again; silence is timed from here
+                        self.silence_detector.reset()
+                        was_monitoring = False
+
+                    if self.gated:
+                        if not was_gated:
+                            self.silence_detector.reset()
+                            was_gated = True
+                        silence_reader.skip_to_latest()
+                        sd.sleep(10)
+                        continue
+                    was_gated = False
+
+                    # Check for silence (for turn-taking/instruction boundaries)
+                    chunk = silence_reader.read()
+                    if len(chunk):
+                        self.silence_detector.process_chunk(chunk)
                     sd.sleep(10)
         except Exception as e:
             print("Audio error:", e)
@@ -86,11 +140,30 @@ class MicWorker(QObject):
     def stop(self):
         self.running = False
 
+    def set_gated(self, gated: bool):
+        """Mute or resume capture without reopening the device."""
+        self.gated = gated
+
+    def set_monitoring(self, monitoring: bool):
+        """Watch for barge-in instead of end-of-speech silence."""
+        self.monitoring = monitoring
+
 
 class MicThread():
-    def __init__(self, noise_floor=0.02, sensitivity=40, silence_duration_sec=3.0):
+    def __init__(
+        self,
+        audio_buffer: AudioRingBuffer,
+        noise_floor=0.02,
+        silence_duration_sec=3.0,
+        barge_in: Optional[BargeInDetector] = None
+    ):
         self.thread = QThread()
-        self.worker = MicWorker(noise_floor=noise_floor, sensitivity=sensitivity, silence_duration_sec=silence_duration_sec)
+        self.worker = MicWorker(
+            audio_buffer,
+            noise_floor=noise_floor,
+            silence_duration_sec=silence_duration_sec,
+            barge_in=barge_in
+        )
         self.worker.moveToThread(self.thread)
         
         # signals
@@ -105,6 +178,25 @@ class MicThread():
         # start thread
         assert self.thread is not None
         self.thread.start()
+
+    def is_running(self) -> bool:
+        return self.thread is not None and self.thread.isRunning()
+
+    def mute(self):
+        """Gate the live stream; resuming is just flipping a flag."""
+        self.worker.set_gated(True)
+
+    def unmute(self):
+        self.worker.set_monitoring(False)
+        self.worker.set_gated(False)
+
+    def monitor(self):
+        """Keep capturing while the assistant speaks, listening only for barge-in."""
+        if self.worker.barge_in is None:
+            self.mute()
+            return
+        self.worker.set_gated(False)
+        self.worker.set_monitoring(True)
     
     def stop(self):
         if self.thread and self.worker:
@@ -0,0 +1,38 @@
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import jinja2
+
+from src.lib.system_info import SystemInfo
+
+
+class PreparedPrompt:
+    """
+    A system prompt rendered once and reused until the SystemInfo values it
+    is built from change, instead of re-rendering the template on every
+    `system_prompt` access (once per ReAct step in the task agent).
+    """
+    def __init__(
+        self,
+        template: jinja2.Template,
+        variables: Optional[Callable[[], Dict[str, Any]]] = None
+    ):
+        """
+        Args:
+            template: The agent's Jinja template.
+            variables: Returns the template variables; called only when the
+                SystemInfo snapshot changes.
+        """
+        self.template = template
+        self.variables = variables or dict
+        self._lock = threading.Lock()
+        self._key: Optional[Tuple[str, ...]] = None
+        self._rendered = ""
+
+    def render(self) -> str:
+        key = SystemInfo.snapshot()
+        with self._lock:
+            if key != self._key:
+                self._rendered = self.template.render(**self.variables())
+                self._key = key
+            return self._rendered
@@ -0,0 +1,143 @@
+from math import gcd
+from typing import Optional
+
+import numpy as np
+from scipy.signal import firwin
+
+
+class StreamingResampler:
+    """
+    Stateful polyphase resampler for block-based audio streams.
+
+    The anti-aliasing filter is designed once (same Kaiser design that
+    `scipy.signal.resample_poly` uses) and split into `up` polyphase
+    branches. The last `taps - 1` input samples are carried over between
+    blocks so consecutive blocks are filtered as one continuous signal,
+    without the edge artifacts of resampling every block on its own.
+
+    All work buffers are preallocated for `max_block` input frames; the
+    returned array is a view into an internal output buffer that is
+    overwritten by the next call to `process`.
+    """
+    def __init__(
+        self,
+        from_rate: int,
+        to_rate: int = 16000,
+        max_block: int = 512,
+        window=("kaiser", 5.0),
+    ):
+        """
+        Args:
+            from_rate: Sample rate of the incoming audio (e.g. device rate).
+            to_rate: Target sample rate.
+            max_block: Largest number of input frames expected per call.
+            window: Window used for the FIR design.
+        """
+        g = gcd(int(from_rate), int(to_rate))
+        self.from_rate = int(from_rate)
+        self.to_rate = int(to_rate)
+        self.up = self.to_rate // g
+        self.down = self.from_rate // g
+        self.passthrough = self.up == self.down == 1
+
+        if self.passthrough:
+            self.taps = 1
+            self._phases = np.ones((1, 1), dtype=np.float32)
+        else:
+            max_rate = max(self.up, self.down)
+            half_len = 10 * max_rate
+            h = firwin(2 * half_len + 1, 1.0 / max_rate, window=window) * self.up
+
+            # Pad so every polyphase branch has the same number of taps
+            self.taps = -(-len(h) // self.up)
+            h = np.concatenate([h, np.zeros(self.taps * self.up - len(h))])
+
+            # Branch p holds h[p], h[p + up], ...; reversed so a branch can be
+            # dotted directly against the input window ending at sample i.
+            self._phases = np.ascontiguousarray(
+                h.reshape(self.taps, self.up).T[:, ::-1], dtype=np.float32
+            )
+
+        # Position of the next output sample on the upsampled time axis,
+        # relative to the first sample of the next input block.
+        self._t = 0
+        self._allocate(max_block)
+
+    def _allocate(self, max_block: int) -> None:
+        self.max_block = max_block
+        max_out = (max_block * self.up) // self.down + 2
+
+        history = np.zeros(self.taps - 1, dtype=np.float32)
+        if getattr(self, "_buffer", None) is not None and self.taps > 1:
+            history[:] = self._buffer[: self.taps - 1]
+
+        self._buffer = np.zeros(self.taps - 1 + max_block, dtype=np.float32)
+        self._buffer[: self.taps - 1] = history
+        self._windows = np.lib.stride_tricks.sliding_window_view(self._buffer, self.taps)
+
+        self._steps = np.arange(max_out, dtype=np.int64) * self.down
+        self._pos = np.empty(max_out, dtype=np.int64)
+        self._index = np.empty(max_out, dtype=np.int64)
+        self._phase = np.empty(max_out, dtype=np.int64)
+        self._gathered = np.empty((max_out, self.taps), dtype=np.float32)
+        self._coeffs = np.empty((max_out, self.taps), dtype=np.float32)
+        self._out = np.empty(max_out, dtype=np.float32)
+
+    def output_size(self, frames: int) -> int:
+        """Number of output samples the next `process` call will produce."""
+        total = frames * self.up
+        if self._t >= total:
+            return 0
+        return -(-(total - self._t) // self.down)
+
+    def process(self, block: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Resample one block of mono audio.
+
+        Args:
+            block: 1-D float array with the new input frames.
+            out: Optional destination array; must hold `output_size(len(block))`
+                samples. Defaults to the resampler's internal buffer.
+
+        Returns:
+            A view containing the resampled samples for this block.
+        """
+        frames = len(block)
+        if frames > self.max_block:
+            self._allocate(frames)
+
+        count = self.output_size(frames)
+        dest = self._out if out is None else out
+
+        if self.passthrough:
+            dest[:frames] = block
+            return dest[:frames]
+
+        history = self.taps - 1
+        self._buffer[history : history + frames] = block
+
+        if count:
+            pos = self._pos[:count]
+            index = self._index[:count]
+            phase = self._phase[:count]
+            np.add(self._steps[:count], self._t, out=pos)
+            np.floor_divide(pos, self.up, out=index)
+            np.remainder(pos, self.up, out=phase)
+
+            gathered = self._gathered[:count]
+            coeffs = self._coeffs[:count]
+            np.take(self._windows, index, axis=0, out=gathered)
+            np.take(self._phases, phase, axis=0, out=coeffs)
+            np.einsum("ij,ij->i", gathered, coeffs, out=dest[:count])
+
+        self._t += count * self.down - frames * self.up
+
+        # Carry the filter state over to the next block
+        self._buffer[:history] = self._buffer[frames : frames + history]
+
+        return dest[:count]
+
+    def reset(self) -> None:
+        """Clear the filter history (e.g. after the stream was restarted)."""
+        self._buffer[:] = 0.0
+        self._t = 0
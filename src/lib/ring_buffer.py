@@ -0,0 +1,127 @@
+from typing import Optional
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    Preallocated single-producer / multi-consumer ring buffer for mono audio.
+
+    The producer (the sounddevice callback) copies samples in and then
+    publishes them by advancing a monotonic write position. Consumers read
+    through their own `RingReader`, each with its own read position, so they
+    can poll at whatever cadence suits them without any locking. A reader
+    that falls more than `capacity` samples behind skips ahead and counts an
+    overrun instead of blocking the producer.
+    """
+    def __init__(self, capacity: int, dtype=np.float32):
+        """
+        Args:
+            capacity: Number of samples kept in the buffer.
+            dtype: Sample type stored in the buffer.
+        """
+        self.capacity = int(capacity)
+        self.dtype = np.dtype(dtype)
+        self._data = np.zeros(self.capacity, dtype=self.dtype)
+        # Total number of samples ever written; only the producer updates it
+        self._write_pos = 0
+
+    @property
+    def write_position(self) -> int:
+        return self._write_pos
+
+    def write(self, frames: np.ndarray) -> None:
+        """Append samples. Never blocks; old samples are overwritten."""
+        n = len(frames)
+        start = self._write_pos
+
+        if n > self.capacity:
+            frames = frames[n - self.capacity:]
+            start += n - self.capacity
+            n = self.capacity
+
+        idx = start % self.capacity
+        first = min(n, self.capacity - idx)
+        self._data[idx:idx + first] = frames[:first]
+        if first < n:
+            self._data[:n - first] = frames[first:]
+
+        # Publish only once the samples are in place
+        self._write_pos = start + n
+
+    def reader(self, from_oldest: bool = False) -> "RingReader":
+        """
+        Create a new consumer.
+
+        Args:
+            from_oldest: Start at the oldest retained sample instead of
+                the current write position.
+        """
+        position = self._write_pos
+        if from_oldest:
+            position = max(0, position - self.capacity)
+        return RingReader(self, position)
+
+
+class RingReader:
+    """A single consumer's view of an `AudioRingBuffer`."""
+    def __init__(self, ring: AudioRingBuffer, position: int):
+        self.ring = ring
+        self.position = position
+        self.overruns = 0
+        self.dropped_samples = 0
+        self._out = np.empty(ring.capacity, dtype=ring.dtype)
+
+    def available(self) -> int:
+        return min(self.ring.write_position - self.position, self.ring.capacity)
+
+    def _skip_overrun(self, write_pos: int) -> None:
+        oldest = write_pos - self.ring.capacity
+        if self.position < oldest:
+            self.overruns += 1
+            self.dropped_samples += oldest - self.position
+            self.position = oldest
+
+    def read(self, max_samples: Optional[int] = None) -> np.ndarray:
+        """
+        Consume pending samples.
+
+        Returns:
+            A view into this reader's own buffer, valid until the next read.
+        """
+        ring = self.ring
+        self._skip_overrun(ring.write_position)
+
+        n = ring.write_position - self.position
+        if max_samples is not None:
+            n = min(n, max_samples)
+        if n <= 0:
+            return self._out[:0]
+
+        start = self.position
+        idx = start % ring.capacity
+        first = min(n, ring.capacity - idx)
+        self._out[:first] = ring._data[idx:idx + first]
+        if first < n:
+            self._out[first:n] = ring._data[:n - first]
+
+        # The producer may have lapped us while we were copying; anything
+        # older than the oldest retained sample is torn and gets dropped.
+        valid_from = ring.write_position - ring.capacity
+        self.position = start + n
+        if valid_from > start:
+            self.overruns += 1
+            torn = min(n, valid_from - start)
+            self.dropped_samples += torn
+            return self._out[torn:n]
+
+        return self._out[:n]
+
+    def skip_to_latest(self) -> None:
+        """Discard everything pending, e.g. after a pause."""
+        self.position = self.ring.write_position
+
+    def rewind(self, samples: int) -> None:
+        """Step back so the last `samples` are read again (as far as still retained)."""
+        oldest = max(0, self.ring.write_position - self.ring.capacity)
+        self.position = max(oldest, self.position - int(samples))
@@ -1,24 +1,27 @@
 import numpy as np
-from typing import Optional
-from time import time
+
+from src.lib.vad import VoiceActivityDetector
 
 
 class SilenceDetector:
     """
     Detects when the user stops speaking (silence longer than a threshold).
-    Tracks audio RMS energy and emits a callback when silence duration exceeds
-    the configured threshold.
+    Runs a spectral VoiceActivityDetector over the audio and emits a callback
+    once the trailing silence, measured in samples, exceeds the configured
+    threshold after some speech has been heard.
     """
-    def __init__(self, silence_duration_sec: float = 3.0, rms_threshold: float = 0.01):
+    def __init__(self, silence_duration_sec: float = 3.0, rms_threshold: float = 0.01, sample_rate: int = 16000):
         """
         Args:
             silence_duration_sec: Duration of silence (in seconds) to trigger detection.
-            rms_threshold: RMS energy below this threshold is considered silence.
+            rms_threshold: RMS energy below this threshold is always considered silence.
+            sample_rate: Sample rate of the chunks passed to `process_chunk`.
         """
         self.silence_duration_sec = silence_duration_sec
         self.rms_threshold = rms_threshold
-        
-        self.last_sound_time: Optional[float] = None
+        self.silence_samples_limit = int(silence_duration_sec * sample_rate)
+
+        self.vad = VoiceActivityDetector(sample_rate=sample_rate, energy_threshold=rms_threshold)
         self.silence_triggered = False
         self.on_silence_callback = None
 
@@ -26,43 +29,39 @@ class SilenceDetector:
         """Register a callback to be called when silence is detected."""
         self.on_silence_callback = callback
 
+    @property
+    def in_speech(self) -> bool:
+        return self.vad.in_speech
+
     def process_chunk(self, chunk: np.ndarray) -> bool:
         """
         Process an audio chunk and check if silence threshold has been exceeded.
-        
+
         Args:
             chunk: Audio chunk as numpy array (float32).
-        
+
         Returns:
             True if silence was just detected, False otherwise.
         """
-        # Calculate RMS (Root Mean Square) energy
-        rms = float(np.sqrt(np.mean(chunk.astype(np.float32) ** 2)))
-        
-        current_time = time()
-        
-        # Update last sound time if above threshold
-        if rms > self.rms_threshold:
-            self.last_sound_time = current_time
+        self.vad.process(chunk)
+
+        if self.vad.in_speech:
             self.silence_triggered = False
             return False
-        
-        # Check if silence duration exceeded
-        if self.last_sound_time is None:
-            # No sound has been detected yet
+
+        # No speech has been detected yet
+        if not self.vad.heard_speech:
             return False
-        
-        silence_duration = current_time - self.last_sound_time
-        
-        if silence_duration >= self.silence_duration_sec and not self.silence_triggered:
+
+        if self.vad.silence_samples >= self.silence_samples_limit and not self.silence_triggered:
             self.silence_triggered = True
             if self.on_silence_callback:
                 self.on_silence_callback()
             return True
-        
+
         return False
 
     def reset(self):
-        """Reset the detector state."""
-        self.last_sound_time = None
+        """Reset the detector state (the learned noise floor is kept)."""
+        self.vad.reset()
         self.silence_triggered = False
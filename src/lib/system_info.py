@@ -1,8 +1,21 @@
 import os
 import platform
 from datetime import datetime
+from typing import Tuple
 
 class SystemInfo:
     USER_OS = f"{platform.system()} {platform.release()}"
     CURRENT_WORKING_DIRECTORY = os.getcwd()
-    CURRENT_DATE = datetime.now().strftime("%Y-%m-%d")
\ No newline at end of file
+    CURRENT_DATE = datetime.now().strftime("%Y-%m-%d")
+
+    @classmethod
+    def refresh(cls) -> None:
+        """Pick up a new date or working directory (e.g. after midnight)."""
+        cls.CURRENT_WORKING_DIRECTORY = os.getcwd()
+        cls.CURRENT_DATE = datetime.now().strftime("%Y-%m-%d")
+
+    @classmethod
+    def snapshot(cls) -> Tuple[str, str, str]:
+        """Current values; anything rendered from them is stale once this changes."""
+        cls.refresh()
+        return (cls.USER_OS, cls.CURRENT_WORKING_DIRECTORY, cls.CURRENT_DATE)
@@ -0,0 +1,91 @@
+import re
+import textwrap
+from typing import List, Tuple
+
+_PUNCTUATION = re.compile(r"[^\w\s']")
+# Curly apostrophes (common in STT output) become straight ones, so
+# "what’s" stays one word like "what's"
+_APOSTROPHES = str.maketrans({"‘": "'", "’": "'"})
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Canonical form of a spoken utterance: lowercase, punctuation dropped,
+    whitespace collapsed. Interim and final transcripts of the same words
+    ("What's the time?" / "what's the time") normalize to the same string.
+    """
+    text = _PUNCTUATION.sub(" ", text.translate(_APOSTROPHES).lower())
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+# Sentence end: terminal punctuation (plus closing quotes/brackets) followed
+# by whitespace. Requiring the whitespace keeps "3.14" together and lets a
+# streaming caller wait for more text before committing the last sentence.
+_SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]*\s+")
+
+
+def pop_sentences(text: str) -> Tuple[List[str], str]:
+    """
+    Split off every complete sentence at the start of `text`.
+
+    Returns:
+        (complete sentences, unfinished remainder)
+    """
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        sentence = text[start:match.end()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+    return sentences, text[start:]
+
+
+_CLAUSE_END = re.compile(r"(?<=[,;:])\s+")
+
+
+def speech_chunks(text: str, max_chars: int = 160) -> List[str]:
+    """
+    Split text into pieces a TTS engine can synthesize one at a time:
+    sentences, with long ones broken at clause punctuation and, failing
+    that, at word boundaries. No chunk exceeds `max_chars`; a longer word
+    (e.g. a string in JSON tool output) is split mid-word.
+    """
+    sentences, rest = pop_sentences(text)
+    if rest.strip():
+        sentences.append(rest.strip())
+
+    chunks = []
+    for sentence in sentences:
+        if len(sentence) <= max_chars:
+            chunks.append(sentence)
+            continue
+
+        current = ""
+        for clause in _CLAUSE_END.split(sentence):
+            for piece in textwrap.wrap(clause, max_chars, break_long_words=True):
+                if current and len(current) + 1 + len(piece) > max_chars:
+                    chunks.append(current)
+                    current = piece
+                else:
+                    current = f"{current} {piece}".strip()
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+_CURRENT_MESSAGE = "\nCurrent message: "
+
+
+def with_context(instruction: str, context: str = "") -> str:
+    """The prompt agents receive: prior conversation, then the current message."""
+    if not context:
+        return instruction
+    return f"Conversation history:\n{context}{_CURRENT_MESSAGE}{instruction}"
+
+
+def instruction_of(prompt: str) -> str:
+    """The current message of a `with_context` prompt."""
+    _, marker, instruction = prompt.rpartition(_CURRENT_MESSAGE)
+    return instruction if marker else prompt
@@ -0,0 +1,155 @@
+import queue
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from PyQt6.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+
+from src.lib.cancellation import TurnCancelled
+
+
+@dataclass
+class TurnRequest:
+    router: Any  # RouterAgent
+    instruction: str
+    history: List[Dict[str, str]] = field(default_factory=list)
+    # Preformatted conversation context; used instead of `history` when set
+    context: Optional[str] = None
+    # Speculative routing decision, possibly still in flight
+    decision: Optional[Future] = None
+    # Set by `TurnWorker.cancel`, including while the request is still queued
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+
+
+class TurnWorker(QObject):
+    """
+    Runs conversational turns (router LLM, task/reasoning agents, tools and
+    TTS) off the GUI thread, one at a time, and reports back via signals.
+    """
+    progress = pyqtSignal(str)           # short status line for the UI
+    display = pyqtSignal(str)            # markdown for the content area
+    completed = pyqtSignal(str, object)  # instruction, response text (or None)
+    finished = pyqtSignal()
+
+    def __init__(self, playback_idle: Optional[threading.Event] = None):
+        """
+        Args:
+            playback_idle: Set while no audio is playing; a turn only
+                completes once it is, so the mic never reopens mid-speech.
+        """
+        super().__init__()
+        self.playback_idle = playback_idle
+        self.requests: "queue.Queue[Optional[TurnRequest]]" = queue.Queue()
+        # Submitted and not finished yet (queued or running)
+        self._open: List[TurnRequest] = []
+        self._lock = threading.Lock()
+        self.running = False
+
+    def submit(self, request: TurnRequest):
+        """Queue a turn. Safe to call from any thread."""
+        with self._lock:
+            self._open.append(request)
+        self.requests.put(request)
+
+    def cancel(self):
+        """
+        Cancel the turn in progress, which stops at its next checkpoint, and
+        any turns still queued, which are dropped without running.
+        """
+        with self._lock:
+            for request in self._open:
+                request.cancel_event.set()
+
+    @pyqtSlot()
+    def run(self):
+        self.running = True
+
+        while self.running:
+            request = self.requests.get()
+            if request is None:
+                break
+
+            cancel_event = request.cancel_event
+            response = None
+            if cancel_event.is_set():
+                print("⏹️ Turn cancelled before it started")
+                self._close(request)
+                self.completed.emit(request.instruction, response)
+                continue
+
+            try:
+                decision = None
+                if request.decision is not None:
+                    self.progress.emit("Waiting for router...")
+                    decision = self._wait_decision(request.decision)
+
+                response = request.router.run(
+                    request.instruction,
+                    history=request.history,
+                    decision=decision,
+                    context=request.context,
+                    cancel_event=cancel_event,
+                    on_progress=self.progress.emit,
+                )
+            except TurnCancelled:
+                print("⏹️ Turn cancelled")
+            except Exception as e:
+                print(f"Error in turn pipeline: {e}")
+
+            if self.playback_idle is not None and not cancel_event.is_set():
+                self.playback_idle.wait(timeout=60)
+
+            self._close(request)
+            self.completed.emit(request.instruction, response)
+
+        self.finished.emit()
+
+    def _close(self, request: TurnRequest):
+        with self._lock:
+            # By identity; dataclass equality would match an identical resubmission
+            self._open = [r for r in self._open if r is not request]
+
+    @staticmethod
+    def _wait_decision(future: Future, timeout: float = 30.0) -> Optional[Dict[str, Any]]:
+        try:
+            return future.result(timeout=timeout)
+        except Exception as e:
+            print(f"Speculative routing failed: {e}")
+            return None
+
+    @pyqtSlot()
+    def stop(self):
+        self.running = False
+        self.cancel()
+        self.requests.put(None)
+
+
+class TurnThread():
+    def __init__(self, playback_idle: Optional[threading.Event] = None):
+        self.thread = QThread()
+        self.worker = TurnWorker(playback_idle)
+        self.worker.moveToThread(self.thread)
+
+        # signals
+        self.thread.started.connect(self.worker.run)
+
+        # cleanup
+        self.worker.finished.connect(self.thread.quit)
+        self.worker.finished.connect(self.worker.deleteLater)
+        self.thread.finished.connect(self.thread.deleteLater)
+
+    def start(self):
+        self.thread.start()
+
+    def submit(self, request: TurnRequest):
+        self.worker.submit(request)
+
+    def cancel(self):
+        self.worker.cancel()
+
+    def stop(self):
+        if self.thread.isRunning():
+            self.worker.stop()
+            self.thread.quit()
+            self.thread.wait()
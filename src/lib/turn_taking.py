@@ -0,0 +1,87 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Optional
+
+
+@dataclass(frozen=True)
+class TurnPolicy:
+    # STT turn events that may end the turn on their own
+    end_events: FrozenSet[str]
+    # Minimum STT end-of-turn confidence for those events to count
+    min_confidence: float
+    # Trailing silence the local VAD needs before it ends the turn
+    vad_silence_sec: float
+    # Confidence at which Flux sends EndOfTurn
+    eot_threshold: float = 0.7
+    # Confidence at which Flux sends EagerEndOfTurn (None: never). Besides
+    # ending the turn in "eager" mode, it lets routing start speculatively.
+    eager_eot_threshold: Optional[float] = None
+
+
+TURN_POLICIES: Dict[str, TurnPolicy] = {
+    "eager": TurnPolicy(frozenset({"EagerEndOfTurn", "EndOfTurn"}), 0.5, 0.6, 0.7, 0.5),
+    "balanced": TurnPolicy(frozenset({"EndOfTurn"}), 0.7, 1.0, 0.7, 0.5),
+    "conservative": TurnPolicy(frozenset({"EndOfTurn"}), 0.85, 1.5, 0.85, 0.6),
+}
+
+
+class TurnTakingEngine:
+    """
+    Decides when the user's turn is over.
+
+    Two independent signals feed it: turn events from the streaming STT
+    (StartOfTurn / Update / EagerEndOfTurn / TurnResumed / EndOfTurn with an
+    end-of-turn confidence) and the local VAD's silence detection. The turn
+    is dispatched as soon as either source is confident, exactly once per
+    turn, until `reset` is called for the next one.
+    """
+    def __init__(self, mode: str = "balanced"):
+        if mode not in TURN_POLICIES:
+            raise ValueError(f"Unknown turn-taking mode: {mode}")
+
+        self.mode = mode
+        self.policy = TURN_POLICIES[mode]
+        self.on_dispatch_callback: Optional[Callable[[str, str], None]] = None
+        self.reset()
+
+    def set_dispatch_callback(self, callback: Callable[[str, str], None]):
+        """Register `callback(transcript, reason)` called when the turn ends."""
+        self.on_dispatch_callback = callback
+
+    def reset(self) -> None:
+        """Start listening for a new turn."""
+        self.transcript = ""
+        self.turn_started = False
+        self.dispatched = False
+        self.last_confidence = 0.0
+
+    def on_stt_event(self, event: str, confidence: float, transcript: str) -> None:
+        if self.dispatched:
+            return
+
+        if event in ("StartOfTurn", "Update", "TurnResumed"):
+            self.turn_started = True
+        if transcript:
+            self.transcript = transcript
+        self.last_confidence = confidence
+
+        # Ignore end-of-turn events left over from before `reset`
+        if not self.turn_started:
+            return
+
+        if event in self.policy.end_events and confidence >= self.policy.min_confidence:
+            self._dispatch(f"stt:{event}")
+
+    def on_vad_silence(self) -> None:
+        if self.dispatched or not self.turn_started:
+            return
+        self._dispatch("vad")
+
+    def _dispatch(self, reason: str) -> None:
+        text = self.transcript.strip()
+        if not text:
+            return
+
+        self.dispatched = True
+        print(f"⏹️ End of turn ({reason}, mode={self.mode})")
+        if self.on_dispatch_callback:
+            self.on_dispatch_callback(text, reason)
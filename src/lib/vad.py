@@ -0,0 +1,176 @@
+from typing import Tuple
+
+import numpy as np
+
+
+class VoiceActivityDetector:
+    """
+    Frame-based voice activity detector for 16 kHz mono float audio.
+
+    Incoming chunks are cut into fixed frames and every batch of frames is
+    analysed in one vectorized pass:
+    - speech-band energy (default 300-3400 Hz) against an adaptive noise floor
+    - zero-crossing rate (keyboard clicks and hiss cross zero very often)
+    - spectral flatness (fans and broadband noise have a flat spectrum)
+
+    Per-frame decisions are smoothed with an onset requirement (hysteresis)
+    and a hangover, and all timing is done in samples rather than wall
+    clock, so results do not depend on how late the consumer polls.
+    """
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 20,
+        energy_threshold: float = 0.01,
+        snr_ratio: float = 3.0,
+        max_flatness: float = 0.45,
+        max_zcr: float = 0.35,
+        band: Tuple[float, float] = (300.0, 3400.0),
+        onset_frames: int = 3,
+        hangover_frames: int = 8,
+        noise_adapt: float = 0.05,
+        max_frames: int = 32,
+    ):
+        """
+        Args:
+            sample_rate: Sample rate of the incoming audio.
+            frame_ms: Analysis frame length in milliseconds.
+            energy_threshold: Absolute RMS below which a frame is never speech.
+            snr_ratio: Speech-band energy must exceed the noise floor by this factor.
+            max_flatness: Frames flatter than this (0..1) are treated as noise.
+            max_zcr: Frames with a higher zero-crossing rate are treated as noise.
+            band: Speech band (Hz) used for the energy and flatness features.
+            onset_frames: Consecutive speech frames required to enter speech.
+            hangover_frames: Non-speech frames tolerated before leaving speech.
+            noise_adapt: Rate at which the noise floor follows rising noise.
+            max_frames: Frames analysed per batch (buffers are preallocated).
+        """
+        self.sample_rate = sample_rate
+        self.frame_len = sample_rate * frame_ms // 1000
+        self.min_energy = energy_threshold ** 2
+        self.snr_ratio = snr_ratio
+        self.max_flatness = max_flatness
+        self.max_zcr = max_zcr
+        self.onset_frames = onset_frames
+        self.hangover_frames = hangover_frames
+        self.noise_adapt = noise_adapt
+        self.max_frames = max_frames
+
+        self._window = np.hanning(self.frame_len).astype(np.float32)
+        freqs = np.fft.rfftfreq(self.frame_len, 1.0 / sample_rate)
+        self._band = (freqs >= band[0]) & (freqs <= band[1])
+
+        # Pending samples live at the front of the staging buffer
+        self._stage = np.zeros((max_frames + 1) * self.frame_len, dtype=np.float32)
+        self._pending = 0
+        self._decisions = np.zeros(max_frames, dtype=bool)
+
+        self.noise_floor = None
+        self.reset()
+
+    def reset(self, keep_noise_floor: bool = True) -> None:
+        """Forget the current turn; the learned noise floor survives by default."""
+        self._pending = 0
+        self._speech_run = 0
+        self._hangover = 0
+        self.in_speech = False
+        self.heard_speech = False
+        # Samples since the last confirmed speech frame
+        self.silence_samples = 0
+        if not keep_noise_floor:
+            self.noise_floor = None
+
+    def features(self, frames: np.ndarray):
+        """
+        Vectorized per-frame features.
+
+        Returns:
+            (energy, band_energy, zcr, flatness), each of shape (n_frames,).
+        """
+        energy = np.mean(np.square(frames), axis=1)
+
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_len - 1)
+
+        power = np.square(np.abs(np.fft.rfft(frames * self._window, axis=1)))
+        band_power = power[:, self._band] + 1e-12
+        total = np.sum(power, axis=1) + 1e-12
+        band_energy = energy * (np.sum(band_power, axis=1) / total)
+
+        flatness = np.exp(np.mean(np.log(band_power), axis=1)) / np.mean(band_power, axis=1)
+
+        return energy, band_energy, zcr, flatness
+
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        """
+        Feed audio and get smoothed speech decisions for every completed frame.
+
+        Returns:
+            Boolean array (a view, valid until the next call) with one entry
+            per frame completed by this chunk. Chunks larger than
+            `max_frames` frames only report the decisions of the last batch.
+        """
+        n = self.frame_len
+        decisions = self._decisions[:0]
+        offset = 0
+
+        while offset < len(chunk):
+            room = self.max_frames * n - self._pending
+            take = min(room, len(chunk) - offset)
+            self._stage[self._pending:self._pending + take] = chunk[offset:offset + take]
+            offset += take
+
+            total = self._pending + take
+            count = total // n
+            if count:
+                frames = self._stage[:count * n].reshape(count, n)
+                decisions = self._decide(frames)
+
+            leftover = total - count * n
+            self._stage[:leftover] = self._stage[count * n:total]
+            self._pending = leftover
+
+        return decisions
+
+    def _decide(self, frames: np.ndarray) -> np.ndarray:
+        energy, band_energy, zcr, flatness = self.features(frames)
+
+        if self.noise_floor is None:
+            self.noise_floor = float(band_energy[0])
+
+        decisions = self._decisions[:len(frames)]
+        for i in range(len(frames)):
+            raw = bool(
+                energy[i] > self.min_energy
+                and band_energy[i] > self.noise_floor * self.snr_ratio
+                and flatness[i] < self.max_flatness
+                and zcr[i] < self.max_zcr
+            )
+
+            if not raw and not self.in_speech:
+                # Follow falling noise quickly and rising noise slowly
+                rate = 0.5 if band_energy[i] < self.noise_floor else self.noise_adapt
+                self.noise_floor += rate * (float(band_energy[i]) - self.noise_floor)
+
+            self._speech_run = self._speech_run + 1 if raw else 0
+
+            if self.in_speech:
+                if raw:
+                    self._hangover = self.hangover_frames
+                    self.silence_samples = 0
+                else:
+                    self.silence_samples += self.frame_len
+                    self._hangover -= 1
+                    if self._hangover <= 0:
+                        self.in_speech = False
+            else:
+                self.silence_samples += self.frame_len
+                if self._speech_run >= self.onset_frames:
+                    self.in_speech = True
+                    self.heard_speech = True
+                    self._hangover = self.hangover_frames
+                    self.silence_samples = 0
+
+            decisions[i] = self.in_speech
+
+        return decisions
@@ -1,3 +1,5 @@
-from .provider import LLMProvider
+from .provider import LLMProvider, get_provider
+from .cache import MemoryCache, DiskCache
+from .replay import ReplayProvider, RecordingProvider
 
-__all__ = ["LLMProvider"]
\ No newline at end of file
+__all__ = ["LLMProvider", "get_provider", "MemoryCache", "DiskCache", "ReplayProvider", "RecordingProvider"]
\ No newline at end of file
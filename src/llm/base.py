@@ -1,8 +1,13 @@
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List,Optional
-from src.llm.llm_response import LLMResponse
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from src.llm.llm_response import LLMResponse, LLMStreamChunk
 from src.lib.chat_history import ChatMessage
 
+# Called once with the time (seconds) from request to the first streamed output
+FirstTokenHook = Callable[[float], None]
+
 class BaseProvider(ABC):
     name: str
 
@@ -28,3 +33,47 @@ class BaseProvider(ABC):
         response_schema = None
     ) -> LLMResponse:   
         ...
+
+    def stream_inference(
+        self,
+        contents: str | List[Dict[str, Any]],
+        system_prompt: str = "",
+        json_mode: bool = False,
+        response_schema = None,
+        on_first_token: Optional[FirstTokenHook] = None
+    ) -> Iterator[LLMStreamChunk]:
+        """
+        Yield text deltas and tool calls as they are generated.
+
+        Providers without a streaming endpoint fall back to this default,
+        which runs `inference` and yields the whole response at once.
+        """
+        started = time.perf_counter()
+        response = self.inference(contents, system_prompt, json_mode, response_schema)
+        if on_first_token:
+            on_first_token(time.perf_counter() - started)
+
+        if response.text_content:
+            yield LLMStreamChunk(text_delta=response.text_content)
+        for tool_call in response.tool_calls:
+            yield LLMStreamChunk(tool_call=tool_call)
+
+    async def ainference(
+        self,
+        contents: str | List[Dict[str, Any]],
+        system_prompt: str = "",
+        json_mode: bool = False,
+        response_schema = None,
+        timeout: Optional[float] = 30.0
+    ) -> LLMResponse:
+        """
+        Async variant of `inference`; cancelling the awaiting task abandons
+        the request and `timeout` raises asyncio.TimeoutError.
+
+        Providers without a native async client fall back to running
+        `inference` in the default executor.
+        """
+        return await asyncio.wait_for(
+            asyncio.to_thread(self.inference, contents, system_prompt, json_mode, response_schema),
+            timeout
+        )
@@ -0,0 +1,354 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.lib.config_manager import ConfigManager
+from src.lib.text import normalize_text
+from src.llm.base import BaseProvider, FirstTokenHook
+from src.llm.llm_response import LLMResponse, LLMStreamChunk
+from src.lib.chat_history import ChatMessage
+
+DISK_CACHE_DIR = ConfigManager.CONFIG_FOLDER / "llm_cache"
+
+
+class CacheBackend:
+    """Storage for cached responses; entries expire at an absolute time."""
+
+    def get(self, key: str) -> Optional[LLMResponse]:
+        raise NotImplementedError
+
+    def set(self, key: str, response: LLMResponse, ttl_sec: float) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, LLMResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[LLMResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, response = entry
+            if expires < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def set(self, key: str, response: LLMResponse, ttl_sec: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + ttl_sec, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskCache(CacheBackend):
+    """
+    One JSON file per entry under `directory`, so the cache survives
+    restarts. Expired entries are removed when they are read; once the
+    files exceed `max_bytes`, expired and then least recently used entries
+    are evicted.
+    """
+
+    def __init__(self, directory: Path = DISK_CACHE_DIR, max_bytes: int = 32 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        # Measured on the first write
+        self._bytes: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[LLMResponse]:
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        if entry.get("expires", 0) < time.time():
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            # Recency for eviction
+            os.utime(path)
+        except OSError:
+            pass
+        return LLMResponse(**entry["response"])
+
+    def set(self, key: str, response: LLMResponse, ttl_sec: float) -> None:
+        entry = {"expires": time.time() + ttl_sec, "response": asdict(response)}
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            try:
+                # Overwriting an entry replaces its bytes
+                replaced = path.stat().st_size
+            except OSError:
+                replaced = 0
+            # Write then rename so a concurrent reader never sees half a file
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                json.dump(entry, f)
+            tmp.replace(path)
+            with self._lock:
+                if self._bytes is None:
+                    self._bytes = sum(p.stat().st_size for p in self.directory.glob("*.json"))
+                else:
+                    self._bytes += path.stat().st_size - replaced
+                over = self._bytes > self.max_bytes
+            if over:
+                self._evict()
+        except (OSError, TypeError) as e:
+            print(f"Failed to write LLM cache entry: {e}")
+
+    def _expired(self, path: Path, now: float) -> bool:
+        try:
+            with open(path) as f:
+                return json.load(f).get("expires", 0) < now
+        except json.JSONDecodeError:
+            # Unreadable entries are useless too
+            return True
+
+    def _evict(self) -> None:
+        now = time.time()
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+                if self._expired(path, now):
+                    path.unlink(missing_ok=True)
+                    continue
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        # Then the least recently used, down to 90% so eviction does not
+        # run on every write
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        with self._lock:
+            self._bytes = total
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*.json"):
+            path.unlink(missing_ok=True)
+        with self._lock:
+            self._bytes = 0
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    skipped: int = 0
+
+
+def _schema_key(response_schema) -> Any:
+    if response_schema is None:
+        return None
+    if hasattr(response_schema, "model_json_schema"):
+        return response_schema.model_json_schema()
+    return repr(response_schema)
+
+
+def cache_key(
+    model: str,
+    system_prompt: str,
+    contents: str | List[Dict[str, Any]],
+    tools: Any,
+    response_schema: Any,
+    normalize: bool = False
+) -> str:
+    """
+    Stable hash of everything that determines a response.
+
+    With `normalize`, text contents are compared case- and
+    punctuation-insensitively, so "What's in this folder?" and "what's in
+    this folder" share an entry.
+    """
+    if normalize and isinstance(contents, str):
+        contents = normalize_text(contents)
+
+    payload = json.dumps(
+        {
+            "model": model,
+            "system": system_prompt,
+            "contents": contents,
+            "tools": tools,
+            "schema": _schema_key(response_schema),
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class CachedProvider(BaseProvider):
+    """
+    Wraps a provider with a response cache.
+
+    Agents opt in by passing a backend to `LLMProvider(cache=...)`. Only
+    plain text/JSON answers are stored: a response carrying a tool call is
+    never cached, since replaying it would re-run a side effect against
+    state that may have changed.
+
+    Prompts that embed the conversation change every turn; `key_text`
+    picks out the part that decides the answer (e.g. the current message)
+    so repeated requests still hit.
+    """
+
+    def __init__(
+        self,
+        provider: BaseProvider,
+        backend: CacheBackend,
+        ttl_sec: float = 600.0,
+        normalize: bool = False,
+        key_text: Optional[Callable[[str], str]] = None,
+        cacheable: Optional[Callable[[LLMResponse], bool]] = None
+    ):
+        """
+        Args:
+            provider: The (pooled) provider to forward misses to.
+            backend: Where responses are stored.
+            ttl_sec: How long an entry stays valid.
+            normalize: Key on normalized text (for voice transcripts).
+            key_text: Maps text contents to what the key is built from.
+            cacheable: Extra check a response must pass to be stored.
+        """
+        self.provider = provider
+        self.name = provider.name
+        self.backend = backend
+        self.ttl_sec = ttl_sec
+        self.normalize = normalize
+        self.key_text = key_text
+        self.cacheable = cacheable
+        self.stats = CacheStats()
+
+    @property
+    def tools(self) -> List[Dict[str, Any]]:
+        return self.provider.tools
+
+    def build_content(self, chats: List[ChatMessage]):
+        return self.provider.build_content(chats)
+
+    def _key(self, contents, system_prompt, json_mode, response_schema) -> str:
+        if self.key_text is not None and isinstance(contents, str):
+            contents = self.key_text(contents)
+        return cache_key(
+            model=getattr(self.provider, "model", self.name),
+            system_prompt=system_prompt,
+            contents=contents,
+            tools=None if json_mode else self.tools,
+            response_schema=response_schema,
+            normalize=self.normalize,
+        )
+
+    def _lookup(self, key: str) -> Optional[LLMResponse]:
+        response = self.backend.get(key)
+        if response is not None:
+            self.stats.hits += 1
+            print("💾 LLM cache hit")
+        else:
+            self.stats.misses += 1
+        return response
+
+    def _store(self, key: str, response: LLMResponse) -> None:
+        if response.tool_calls or not response.text_content:
+            self.stats.skipped += 1
+            return
+        if self.cacheable is not None and not self.cacheable(response):
+            self.stats.skipped += 1
+            return
+        self.backend.set(key, response, self.ttl_sec)
+
+    def inference(
+        self,
+        contents: str | List[Dict[str, Any]],
+        system_prompt: str = "",
+        json_mode: bool = False,
+        response_schema = None
+    ) -> LLMResponse:
+        key = self._key(contents, system_prompt, json_mode, response_schema)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        response = self.provider.inference(contents, system_prompt, json_mode, response_schema)
+        self._store(key, response)
+        return response
+
+    def stream_inference(
+        self,
+        contents: str | List[Dict[str, Any]],
+        system_prompt: str = "",
+        json_mode: bool = False,
+        response_schema = None,
+        on_first_token: Optional[FirstTokenHook] = None
+    ) -> Iterator[LLMStreamChunk]:
+        started = time.perf_counter()
+        key = self._key(contents, system_prompt, json_mode, response_schema)
+        cached = self._lookup(key)
+        if cached is not None:
+            if on_first_token:
+                on_first_token(time.perf_counter() - started)
+            yield LLMStreamChunk(text_delta=cached.text_content or "")
+            return
+
+        text = ""
+        tool_calls = []
+        for chunk in self.provider.stream_inference(
+            contents, system_prompt, json_mode, response_schema, on_first_token
+        ):
+            text += chunk.text_delta
+            if chunk.tool_call:
+                tool_calls.append(chunk.tool_call)
+            yield chunk
+
+        # Only reached if the caller consumed the whole stream
+        self._store(key, LLMResponse(text_content=text, tool_calls=tool_calls))
+
+    async def ainference(
+        self,
+        contents: str | List[Dict[str, Any]],
+        system_prompt: str = "",
+        json_mode: bool = False,
+        response_schema = None,
+        timeout: Optional[float] = 30.0
+    ) -> LLMResponse:
+        key = self._key(contents, system_prompt, json_mode, response_schema)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        response = await self.provider.ainference(contents, system_prompt, json_mode, response_schema, timeout)
+        self._store(key, response)
+        return response
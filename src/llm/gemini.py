@@ -1,80 +1,305 @@
+import asyncio
+import hashlib
 import os
-from typing import Any, Dict, List
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
 from google.genai import Client as geminiClient, types
 
-from src.llm.llm_response import LLMResponse
-from src.llm.base import BaseProvider
-from src.tools.registry import TOOL_REGISTRY
-from src.lib.chat_history import ChatMessage
+from src.llm.llm_response import LLMResponse, LLMStreamChunk
+from src.llm.base import BaseProvider, FirstTokenHook
+from src.llm.gemini_content import build_gemini_content
+from src.tools.registry import TOOL_REGISTRY, registry_version
+
+
+_CLIENTS: Dict[Optional[str], geminiClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+def shared_client(api_key: Optional[str] = None) -> geminiClient:
+    """
+    One google-genai client per API key for the whole process, so all
+    models and agents share its HTTP connection pool (no fresh TLS
+    handshake per turn).
+    """
+    api_key = api_key or os.environ.get("GEMINI_API_KEY")
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(api_key)
+        if client is None:
+            client = geminiClient(api_key=api_key)
+            _CLIENTS[api_key] = client
+        return client
+
+
+def cached_content_key(model: str, system_prompt: str, tools) -> str:
+    return hashlib.sha256(f"{model}\n{system_prompt}\n{tools}".encode()).hexdigest()
+
+
+# Explicit context caching only pays off (and is only accepted by the API)
+# above a minimum prefix size (system instruction + tools); rough estimate
+# of 4 characters per token
+CONTEXT_CACHE_MIN_TOKENS = 1024
+CONTEXT_CACHE_TTL_SEC = 3600
 
 
 class GeminiProvider(BaseProvider):
     name = "Gemini"
 
-    def __init__(self, model: str):
+    def __init__(self, model: str, context_cache: bool = True, max_configs: int = 16):
+        """
+        Args:
+            model: Gemini model name.
+            context_cache: Put long static prefixes (system instruction +
+                tools) in a Gemini context cache where the API accepts it.
+            max_configs: Prepared GenerateContentConfigs kept around.
+        """
         self.model = model
-        self.client = geminiClient(api_key=os.environ.get("GEMINI_API_KEY"))
+        self.client = shared_client()
+        self.context_cache = context_cache
+        self.max_configs = max_configs
+
+        self._lock = threading.Lock()
+        self._tools: Optional[List[Dict[str, Any]]] = None
+        self._tools_version = -1
+        # key -> (config, valid until); only configs that point at a
+        # context cache expire
+        self._configs: "OrderedDict[Hashable, Tuple[types.GenerateContentConfig, float]]" = OrderedDict()
+        # prefix hash -> (cache name or None if the API refused it, expiry)
+        self._context_caches: Dict[str, Tuple[Optional[str], float]] = {}
 
     @property
     def tools(self) -> List[Dict[str, Any]]:
-        # Gemini uses function_declarations with JSON schema
-        fns = []
-        for t in TOOL_REGISTRY.values():
-            fns.append(
-                {
-                    "name": t.name,
-                    "description": t.description,
-                    "parameters": t.parameters,
-                }
-            )
-        return [{"function_declarations": fns}]
+        # Gemini uses function_declarations with JSON schema; rebuilt only
+        # when the tool registry changes
+        version = registry_version()
+        with self._lock:
+            if self._tools is None or self._tools_version != version:
+                fns = []
+                for t in TOOL_REGISTRY.values():
+                    fns.append(
+                        {
+                            "name": t.name,
+                            "description": t.description,
+                            "parameters": t.parameters,
+                        }
+                    )
+                self._tools = [{"function_declarations": fns}]
+                self._tools_version = version
+            return self._tools
     
-    @staticmethod
-    def build_content(chats: List[ChatMessage]):
-        contents = []
-        
-        for chat in chats:
-            content = chat["content"]
-
-            parsed_chat = {}
+    # Shared with ReplayProvider, which must not need the Gemini SDK
+    build_content = staticmethod(build_gemini_content)
 
-            if isinstance(content, str): # text
-                parsed_chat = {"role": chat["role"], "parts": [{"text": content}]}
-            if "args" in content: # tool_call
-                parsed_chat = {"role": "model", "parts": [{"function_call": content}]}
-            if "response" in content: # tool_response
-                parsed_chat = {"role": "tool", "parts": [{"function_response": content}]}
+    def _build_request(
+        self,
+        contents: str | List[Dict[str, Any]],
+        system_prompt: str = "",
+        json_mode: bool = False,
+        response_schema = None
+    ):
+        config = self._prepared_config(system_prompt, json_mode, response_schema)
+        return self._contents(contents), config
 
-            contents.append(parsed_chat)
-        
-        return contents
-    
-    def inference(
-        self, 
-        contents: str | List[Dict[str, Any]], 
+    async def _abuild_request(
+        self,
+        contents: str | List[Dict[str, Any]],
         system_prompt: str = "",
         json_mode: bool = False,
         response_schema = None
-    ) -> LLMResponse:
-        
-        _contents: List[Dict[str, Any]] = []
+    ):
+        # Creating a context cache is a network call; on an event loop it
+        # must not block
+        config = await self._aprepared_config(system_prompt, json_mode, response_schema)
+        return self._contents(contents), config
+
+    @staticmethod
+    def _contents(contents: str | List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if isinstance(contents, str):
+            return [{"role": "user", "parts": [{"text": contents }]}]
+        return contents
+
+    def _config_key(self, system_prompt: str, json_mode: bool, response_schema) -> Hashable:
+        return (system_prompt, json_mode, response_schema, registry_version())
+
+    def _known_config(self, key: Hashable) -> Optional[types.GenerateContentConfig]:
+        with self._lock:
+            entry = self._configs.get(key)
+            if entry is not None and entry[1] > time.time():
+                self._configs.move_to_end(key)
+                return entry[0]
+        return None
+
+    def _prepared_config(
+        self,
+        system_prompt: str,
+        json_mode: bool,
+        response_schema
+    ) -> types.GenerateContentConfig:
+        """
+        Build the GenerateContentConfig for a (system prompt, mode, schema)
+        once and reuse it. Tool changes show up through the registry
+        version in the key.
+        """
+        key = self._config_key(system_prompt, json_mode, response_schema)
+        config = self._known_config(key)
+        if config is not None:
+            return config
 
         tools = None if json_mode else self.tools
-        config = types.GenerateContentConfig(
-            safety_settings=[],
-            tools=tools,
-            system_instruction=system_prompt,
-        )
+        prefix = self._context_cache_prefix(system_prompt, tools)
+        cached = self._known_context_cache(prefix)
+        if cached is None:
+            cached = self._create_context_cache(prefix, system_prompt, tools)
+        return self._store_config(key, system_prompt, json_mode, response_schema, tools, cached)
+
+    async def _aprepared_config(
+        self,
+        system_prompt: str,
+        json_mode: bool,
+        response_schema
+    ) -> types.GenerateContentConfig:
+        """`_prepared_config` for the event loop."""
+        key = self._config_key(system_prompt, json_mode, response_schema)
+        config = self._known_config(key)
+        if config is not None:
+            return config
+
+        tools = None if json_mode else self.tools
+        prefix = self._context_cache_prefix(system_prompt, tools)
+        cached = self._known_context_cache(prefix)
+        if cached is None:
+            cached = await self._acreate_context_cache(prefix, system_prompt, tools)
+        return self._store_config(key, system_prompt, json_mode, response_schema, tools, cached)
+
+    def _store_config(
+        self,
+        key: Hashable,
+        system_prompt: str,
+        json_mode: bool,
+        response_schema,
+        tools,
+        cached: Tuple[Optional[str], float]
+    ) -> types.GenerateContentConfig:
+        cached_content, valid_until = cached
+        if cached_content:
+            # System instruction and tools live in the cache
+            config = types.GenerateContentConfig(
+                safety_settings=[],
+                cached_content=cached_content,
+            )
+        else:
+            config = types.GenerateContentConfig(
+                safety_settings=[],
+                tools=tools,
+                system_instruction=system_prompt,
+            )
 
         if json_mode:
             config.response_mime_type = "application/json"
         if response_schema:
             config.response_schema = response_schema
 
-        if isinstance(contents, str):
-            _contents.append({"role": "user", "parts": [{"text": contents }]})
-        else:
-            _contents = contents
+        with self._lock:
+            self._configs[key] = (config, valid_until)
+            while len(self._configs) > self.max_configs:
+                self._configs.popitem(last=False)
+        return config
+
+    def _context_cache_prefix(self, system_prompt: str, tools) -> Optional[str]:
+        """
+        Key of the static prefix (system instruction + tools), or None when
+        context caching is off or the prefix is too short for the API.
+        """
+        if not self.context_cache:
+            return None
+        if (len(system_prompt) + len(str(tools or ""))) // 4 < CONTEXT_CACHE_MIN_TOKENS:
+            return None
+        return cached_content_key(self.model, system_prompt, tools)
+
+    def _known_context_cache(self, prefix: Optional[str]) -> Optional[Tuple[Optional[str], float]]:
+        """
+        (cache name, valid until) of a prefix, or None if it has to be
+        created first. A name of None means the full prompt is sent.
+        """
+        if prefix is None:
+            return None, float("inf")
+        with self._lock:
+            cached = self._context_caches.get(prefix)
+        if cached is not None and cached[1] > time.time():
+            return cached
+        return None
+
+    def _context_cache_config(self, system_prompt: str, tools) -> types.CreateCachedContentConfig:
+        return types.CreateCachedContentConfig(
+            system_instruction=system_prompt,
+            tools=tools,
+            ttl=f"{CONTEXT_CACHE_TTL_SEC}s",
+        )
+
+    def _create_context_cache(self, prefix: str, system_prompt: str, tools) -> Tuple[Optional[str], float]:
+        name = None
+        try:
+            cache = self.client.caches.create(
+                model=self.model,
+                config=self._context_cache_config(system_prompt, tools),
+            )
+            name = cache.name
+            print(f"💾 Gemini context cache created: {name}")
+        except Exception as e:
+            print(f"Gemini context caching unavailable, sending the full prompt: {e}")
+        return self._remember_context_cache(prefix, name)
+
+    async def _acreate_context_cache(self, prefix: str, system_prompt: str, tools) -> Tuple[Optional[str], float]:
+        name = None
+        try:
+            cache = await self.client.aio.caches.create(
+                model=self.model,
+                config=self._context_cache_config(system_prompt, tools),
+            )
+            name = cache.name
+            print(f"💾 Gemini context cache created: {name}")
+        except Exception as e:
+            print(f"Gemini context caching unavailable, sending the full prompt: {e}")
+        return self._remember_context_cache(prefix, name)
+
+    def _remember_context_cache(self, prefix: str, name: Optional[str]) -> Tuple[Optional[str], float]:
+        # Refresh a little before the server-side TTL runs out; a refusal
+        # is remembered just as long
+        cached = (name, time.time() + CONTEXT_CACHE_TTL_SEC * 0.9)
+        with self._lock:
+            self._context_caches[prefix] = cached
+        return cached
+
+    @staticmethod
+    def _candidate_parts(response) -> list:
+        candidates = getattr(response, "candidates", []) or []
+        if not candidates:
+            return []
+
+        content = getattr(candidates[0], "content", None)
+        return getattr(content, "parts", []) or []
+
+    @staticmethod
+    def _parse_tool_call(part) -> Optional[Dict[str, Any]]:
+        if hasattr(part, "function_call") and part.function_call:
+            fn_call = part.function_call
+            print(fn_call)
+
+            return {
+                "name": getattr(fn_call, "name", None),
+                "args": getattr(fn_call, "args", None),
+            }
+        return None
+
+    def inference(
+        self, 
+        contents: str | List[Dict[str, Any]], 
+        system_prompt: str = "",
+        json_mode: bool = False,
+        response_schema = None
+    ) -> LLMResponse:
+        
+        _contents, config = self._build_request(contents, system_prompt, json_mode, response_schema)
 
         response = self.client.models.generate_content(
             model=self.model,
@@ -82,34 +307,83 @@ class GeminiProvider(BaseProvider):
             config=config
         )
 
+        return self._parse_response(response)
+
+    async def ainference(
+        self,
+        contents: str | List[Dict[str, Any]],
+        system_prompt: str = "",
+        json_mode: bool = False,
+        response_schema = None,
+        timeout: Optional[float] = 30.0
+    ) -> LLMResponse:
 
+        _contents, config = await self._abuild_request(contents, system_prompt, json_mode, response_schema)
+
+        # Native aio client: runs on the caller's event loop, no thread per
+        # request, and cancelling the awaiting task aborts the HTTP call
+        response = await asyncio.wait_for(
+            self.client.aio.models.generate_content(
+                model=self.model,
+                contents=_contents,
+                config=config
+            ),
+            timeout
+        )
+
+        return self._parse_response(response)
+
+    def _parse_response(self, response) -> LLMResponse:
         candidates = getattr(response, "candidates", []) or []
         if not candidates:
             return LLMResponse(text_content="")
-        
-        model_candidate = candidates[0]
 
         text_content = ""
-        tool_call = None
-        
-        content = getattr(model_candidate, "content", None)
-        parts = getattr(content, "parts", []) or []
+        tool_calls = []
 
-        for part in parts:
+        for part in self._candidate_parts(response):
         
             txt = getattr(part, "text", "") or "" # this fuck returns None
             text_content += txt
             
-            if hasattr(part, "function_call") and part.function_call:
-                fn_call = part.function_call
-                print(fn_call)
+            tool_call = self._parse_tool_call(part)
+            if tool_call:
+                tool_calls.append(tool_call)
+
+        return LLMResponse(text_content=text_content, tool_calls=tool_calls)
+
+    def stream_inference(
+        self,
+        contents: str | List[Dict[str, Any]],
+        system_prompt: str = "",
+        json_mode: bool = False,
+        response_schema = None,
+        on_first_token: Optional[FirstTokenHook] = None
+    ) -> Iterator[LLMStreamChunk]:
+        
+        _contents, config = self._build_request(contents, system_prompt, json_mode, response_schema)
+
+        started = time.perf_counter()
+        first = True
+
+        for response in self.client.models.generate_content_stream(
+            model=self.model,
+            contents=_contents,
+            config=config
+        ):
+            for part in self._candidate_parts(response):
+                txt = getattr(part, "text", "") or ""
+                tool_call = self._parse_tool_call(part)
 
-                tool_name = getattr(fn_call, "name", None)
-                tool_args = getattr(fn_call, "args", None)
+                if not txt and not tool_call:
+                    continue
 
-                tool_call = {
-                    "name": tool_name,
-                    "args": tool_args,
-                }
+                if first:
+                    first = False
+                    if on_first_token:
+                        on_first_token(time.perf_counter() - started)
 
-        return LLMResponse(text_content=text_content, tool_call=tool_call)
\ No newline at end of file
+                if txt:
+                    yield LLMStreamChunk(text_delta=txt)
+                if tool_call:
+                    yield LLMStreamChunk(tool_call=tool_call)
@@ -0,0 +1,36 @@
+from typing import Any, Dict, List
+
+from src.lib.chat_history import ChatMessage
+
+
+def build_gemini_content(chats: List[ChatMessage]) -> List[Dict[str, Any]]:
+    """Chat messages as Gemini `contents` (plain dicts, no SDK types)."""
+    contents = []
+    
+    for chat in chats:
+        content = chat["content"]
+
+        parsed_chat = {}
+
+        if isinstance(content, str): # text
+            parsed_chat = {"role": chat["role"], "parts": [{"text": content}]}
+        elif "args" in content: # tool_call
+            parsed_chat = {"role": "model", "parts": [{"function_call": content}]}
+        elif "response" in content: # tool_response
+            parsed_chat = {"role": "tool", "parts": [{"function_response": content}]}
+
+        # Parallel calls of one turn go in a single model content, and
+        # their responses together in the following one
+        previous = contents[-1] if contents else None
+        if (
+            not isinstance(content, str)
+            and previous
+            and previous["role"] == parsed_chat["role"]
+            and parsed_chat["parts"][0].keys() == previous["parts"][-1].keys()
+        ):
+            previous["parts"].extend(parsed_chat["parts"])
+            continue
+
+        contents.append(parsed_chat)
+    
+    return contents
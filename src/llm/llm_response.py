@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Dict, Any, Optional
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional
 
 @dataclass
 class LLMResponse:
@@ -8,4 +8,22 @@ class LLMResponse:
     
     # If the model wants to act
     # format: {"name": "run_bash", "args": {"command": "ls"}}
-    tool_call: Optional[Dict[str, Any]] = None
\ No newline at end of file
+    tool_call: Optional[Dict[str, Any]] = None
+
+    # Every function call of the turn, in order (`tool_call` is the first);
+    # the model may ask for several independent calls at once
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+
+    def __post_init__(self):
+        if self.tool_call and not self.tool_calls:
+            self.tool_calls = [self.tool_call]
+        elif self.tool_calls and not self.tool_call:
+            self.tool_call = self.tool_calls[0]
+
+@dataclass
+class LLMStreamChunk:
+    # Text generated since the previous chunk
+    text_delta: str = ""
+
+    # A complete function call, emitted as soon as the model produced it
+    tool_call: Optional[Dict[str, Any]] = None
@@ -1,18 +1,86 @@
-from typing import Optional, Type, Dict, Any, List
+import importlib
+import os
+import threading
+from typing import Callable, Optional, Type, Dict, Any, List, Tuple
 from src.llm.base import BaseProvider
-from src.llm.gemini import GeminiProvider
+from src.llm.cache import CacheBackend, CachedProvider
+from src.llm.llm_response import LLMResponse
+from src.llm.replay import RecordingProvider
 
 
-LLM_PROVIDER_MAP: Dict[str, Type[BaseProvider]] = {
-    "gemini": GeminiProvider,
+# "module:Class", imported on first use so offline replay runs without the Gemini SDK
+LLM_PROVIDER_MAP: Dict[str, str] = {
+    "gemini": "src.llm.gemini:GeminiProvider",
+    # Offline: `model` is the path of a recording (see ReplayProvider)
+    "replay": "src.llm.replay:ReplayProvider",
 }
 
-class LLMProvider():
+DEFAULT_MODEL = "models/gemini-2.5-flash"
+DEFAULT_MODELS: Dict[str, str] = {
+    "gemini": DEFAULT_MODEL,
+    "replay": "",
+}
+
+# Provider agents use unless given one, e.g. LLM_PROVIDER=replay with
+# LLM_MODEL=<recording.jsonl> runs the whole app offline
+DEFAULT_PROVIDER = os.environ.get("LLM_PROVIDER", "gemini")
+
+def provider_class(provider: str) -> Type[BaseProvider]:
+    module, _, name = LLM_PROVIDER_MAP[provider].partition(":")
+    return getattr(importlib.import_module(module), name)
 
-    def __init__(self, provider: str):
-        
-        ProviderClass = LLM_PROVIDER_MAP[provider]
+def default_model(provider: str) -> str:
+    return os.environ.get("LLM_MODEL") or DEFAULT_MODELS.get(provider, "")
 
-        # todo        
-        self.model = ProviderClass(model="models/gemini-2.5-flash")
+# Providers are shared process-wide so every agent reuses the same client
+# (and its pooled HTTP connections) instead of building its own per turn.
+_PROVIDER_POOL: Dict[Tuple[str, str], BaseProvider] = {}
+_PROVIDER_POOL_LOCK = threading.Lock()
+
+def get_provider(provider: Optional[str] = None, model: Optional[str] = None) -> BaseProvider:
+    """Return the pooled provider instance for (provider, model), creating it once."""
+    provider = provider or DEFAULT_PROVIDER
+    model = model if model is not None else default_model(provider)
+    key = (provider, model)
+    with _PROVIDER_POOL_LOCK:
+        instance = _PROVIDER_POOL.get(key)
+        if instance is None:
+            ProviderClass = provider_class(provider)
+            instance = ProviderClass(model=model)
+            _PROVIDER_POOL[key] = instance
+        return instance
+
+class LLMProvider():
 
+    def __init__(
+        self,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        cache: Optional[CacheBackend] = None,
+        cache_ttl_sec: float = 600.0,
+        normalize_cache_key: bool = False,
+        cache_key_text: Optional[Callable[[str], str]] = None,
+        cacheable: Optional[Callable[[LLMResponse], bool]] = None
+    ):
+        """
+        Args:
+            provider: Key in LLM_PROVIDER_MAP (LLM_PROVIDER by default).
+            model: Model name passed to the provider (LLM_MODEL, or the
+                provider's default, when None).
+            cache: Opt-in response cache for this agent. Leave unset for
+                agents whose turns call tools.
+            cache_ttl_sec: How long cached responses stay valid.
+            normalize_cache_key: Match cached prompts ignoring case and
+                punctuation, for voice transcripts.
+            cache_key_text: The part of a text prompt the cache is keyed on.
+            cacheable: Which responses may be cached (all by default).
+        """
+        self.model = get_provider(provider, model)
+        # Set LLM_RECORD_PATH to capture every request/response for replay
+        record_path = os.environ.get("LLM_RECORD_PATH")
+        if record_path and (provider or DEFAULT_PROVIDER) != "replay":
+            self.model = RecordingProvider(self.model, record_path)
+        if cache is not None:
+            self.model = CachedProvider(
+                self.model, cache, cache_ttl_sec, normalize_cache_key, cache_key_text, cacheable
+            )
@@ -0,0 +1,270 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.llm.base import BaseProvider, FirstTokenHook
+from src.llm.cache import cache_key
+from src.llm.gemini_content import build_gemini_content
+from src.llm.llm_response import LLMResponse, LLMStreamChunk
+from src.tools.registry import TOOL_REGISTRY
+
+
+def request_key(
+    tools: Any,
+    contents: str | List[Dict[str, Any]],
+    system_prompt: str = "",
+    json_mode: bool = False,
+    response_schema = None
+) -> str:
+    """Model-independent key of a request, shared by recording and replay."""
+    return cache_key(
+        model="",
+        system_prompt=system_prompt,
+        contents=contents,
+        tools=None if json_mode else tools,
+        response_schema=response_schema,
+    )
+
+
+def _last_turn(contents: str | List[Dict[str, Any]]) -> str:
+    if isinstance(contents, str):
+        return contents
+    return json.dumps(contents[-1], default=str) if contents else ""
+
+
+class ReplayProvider(BaseProvider):
+    """
+    Offline provider that answers from a recording instead of the network.
+
+    `model` is the path of a jsonl file with one entry per line:
+      {"key": ..., "response": {...}}    exact request recorded by RecordingProvider
+      {"match": "...", "response": {...}} scripted; matches when the text occurs
+                                         (case-insensitively) in the last turn
+    A scripted entry may add "system": "..." to only answer requests whose
+    system prompt contains that text, i.e. one agent when several share the
+    provider. Exact entries win; scripted ones are tried in file order.
+    Responses may carry `tool_calls`, so ReAct loops replay too.
+
+    Latency is simulated: `first_token_sec` before the first streamed chunk,
+    `total_sec` for the whole response. Defaults come from the
+    REPLAY_FIRST_TOKEN_MS / REPLAY_TOTAL_MS environment variables.
+    """
+    name = "Replay"
+
+    def __init__(
+        self,
+        model: str = "",
+        first_token_sec: Optional[float] = None,
+        total_sec: Optional[float] = None,
+        strict: bool = True,
+        chunk_chars: int = 16
+    ):
+        """
+        Args:
+            model: Path of the recording (may be empty for a scripted-only provider).
+            first_token_sec: Simulated time to first token.
+            total_sec: Simulated time for the complete response.
+            strict: Raise KeyError for unrecorded requests instead of
+                returning an empty response.
+            chunk_chars: Size of the text deltas `stream_inference` yields.
+        """
+        self.model = model
+        self.first_token_sec = first_token_sec if first_token_sec is not None else float(os.environ.get("REPLAY_FIRST_TOKEN_MS", 0)) / 1000
+        self.total_sec = total_sec if total_sec is not None else float(os.environ.get("REPLAY_TOTAL_MS", 0)) / 1000
+        self.total_sec = max(self.total_sec, self.first_token_sec)
+        self.strict = strict
+        self.chunk_chars = chunk_chars
+
+        self.recorded: Dict[str, LLMResponse] = {}
+        self.scripted: List[Tuple[str, Optional[str], LLMResponse]] = []
+        self.calls = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if model and Path(model).exists():
+            self.load(model)
+
+    @property
+    def tools(self) -> List[Dict[str, Any]]:
+        # Same declarations Gemini sends, so recorded keys line up
+        fns = [
+            {"name": t.name, "description": t.description, "parameters": t.parameters}
+            for t in TOOL_REGISTRY.values()
+        ]
+        return [{"function_declarations": fns}]
+
+    # Recordings hold Gemini-format contents
+    build_content = staticmethod(build_gemini_content)
+
+    def load(self, path: str | Path) -> None:
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                response = LLMResponse(**entry["response"])
+                if "key" in entry:
+                    self.recorded[entry["key"]] = response
+                elif "match" in entry:
+                    self.script(entry["match"], response, entry.get("system"))
+
+    def script(self, match: str, response: LLMResponse, system: Optional[str] = None) -> None:
+        """
+        Answer any request whose last turn contains `match` with `response`,
+        optionally only if its system prompt contains `system`.
+        """
+        self.scripted.append((match.lower(), system, response))
+
+    def _lookup(self, contents, system_prompt, json_mode, response_schema) -> LLMResponse:
+        with self._lock:
+            self.calls += 1
+
+        key = request_key(self.tools, contents, system_prompt, json_mode, response_schema)
+        response = self.recorded.get(key)
+        if response is not None:
+            return response
+
+        last_turn = _last_turn(contents).lower()
+        for match, system, response in self.scripted:
+            if match in last_turn and (system is None or system in system_prompt):
+                return response
+
+        with self._lock:
+            self.misses += 1
+        if self.strict:
+            raise KeyError(f"No recorded response for request: {_last_turn(contents)[:200]}")
+        return LLMResponse(text_content="")
+
+    def inference(
+        self,
+        contents: str | List[Dict[str, Any]],
+        system_prompt: str = "",
+        json_mode: bool = False,
+        response_schema = None
+    ) -> LLMResponse:
+        response = self._lookup(contents, system_prompt, json_mode, response_schema)
+        time.sleep(self.total_sec)
+        return response
+
+    def stream_inference(
+        self,
+        contents: str | List[Dict[str, Any]],
+        system_prompt: str = "",
+        json_mode: bool = False,
+        response_schema = None,
+        on_first_token: Optional[FirstTokenHook] = None
+    ) -> Iterator[LLMStreamChunk]:
+        started = time.perf_counter()
+        response = self._lookup(contents, system_prompt, json_mode, response_schema)
+
+        text = response.text_content or ""
+        pieces = [text[i:i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)]
+        chunks = [LLMStreamChunk(text_delta=piece) for piece in pieces]
+        chunks += [LLMStreamChunk(tool_call=tool_call) for tool_call in response.tool_calls]
+        if not chunks:
+            time.sleep(self.total_sec)
+            return
+
+        time.sleep(self.first_token_sec)
+        if on_first_token:
+            on_first_token(time.perf_counter() - started)
+
+        # Spread the rest of the response evenly over the remaining time
+        gap = (self.total_sec - self.first_token_sec) / max(1, len(chunks) - 1)
+        for i, chunk in enumerate(chunks):
+            if i:
+                time.sleep(gap)
+            yield chunk
+
+    async def ainference(
+        self,
+        contents: str | List[Dict[str, Any]],
+        system_prompt: str = "",
+        json_mode: bool = False,
+        response_schema = None,
+        timeout: Optional[float] = 30.0
+    ) -> LLMResponse:
+        response = self._lookup(contents, system_prompt, json_mode, response_schema)
+        # Non-blocking, so load tests can run many requests on one loop
+        await asyncio.wait_for(asyncio.sleep(self.total_sec), timeout)
+        return response
+
+
+class RecordingProvider(BaseProvider):
+    """
+    Passes requests through to a real provider and appends each
+    request→response pair to `path` in the format ReplayProvider reads.
+    """
+
+    def __init__(self, provider: BaseProvider, path: str | Path):
+        self.provider = provider
+        self.name = provider.name
+        self.model = getattr(provider, "model", "")
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    @property
+    def tools(self) -> List[Dict[str, Any]]:
+        return self.provider.tools
+
+    def build_content(self, chats):
+        return self.provider.build_content(chats)
+
+    def _record(self, contents, system_prompt, json_mode, response_schema, response: LLMResponse) -> None:
+        entry = {
+            "key": request_key(self.tools, contents, system_prompt, json_mode, response_schema),
+            "last_turn": _last_turn(contents),
+            "response": asdict(response),
+        }
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+
+    def inference(
+        self,
+        contents: str | List[Dict[str, Any]],
+        system_prompt: str = "",
+        json_mode: bool = False,
+        response_schema = None
+    ) -> LLMResponse:
+        response = self.provider.inference(contents, system_prompt, json_mode, response_schema)
+        self._record(contents, system_prompt, json_mode, response_schema, response)
+        return response
+
+    def stream_inference(
+        self,
+        contents: str | List[Dict[str, Any]],
+        system_prompt: str = "",
+        json_mode: bool = False,
+        response_schema = None,
+        on_first_token: Optional[FirstTokenHook] = None
+    ) -> Iterator[LLMStreamChunk]:
+        text = ""
+        tool_calls = []
+        for chunk in self.provider.stream_inference(
+            contents, system_prompt, json_mode, response_schema, on_first_token
+        ):
+            text += chunk.text_delta
+            if chunk.tool_call:
+                tool_calls.append(chunk.tool_call)
+            yield chunk
+
+        self._record(contents, system_prompt, json_mode, response_schema, LLMResponse(text_content=text, tool_calls=tool_calls))
+
+    async def ainference(
+        self,
+        contents: str | List[Dict[str, Any]],
+        system_prompt: str = "",
+        json_mode: bool = False,
+        response_schema = None,
+        timeout: Optional[float] = 30.0
+    ) -> LLMResponse:
+        response = await self.provider.ainference(contents, system_prompt, json_mode, response_schema, timeout)
+        self._record(contents, system_prompt, json_mode, response_schema, response)
+        return response
@@ -5,48 +5,238 @@ from deepgram import AsyncDeepgramClient
 from deepgram.core.events import EventType
 from deepgram.extensions.types.sockets import ListenV2SocketClientResponse
 
+from dataclasses import dataclass
 from typing import Any, Optional
 
+from src.lib.ring_buffer import RingReader
+from src.lib.turn_taking import TURN_POLICIES, TurnPolicy
+from src.stt.pcm_framer import PCM16Framer
+
+@dataclass
+class STTSessionStats:
+    connects: int = 0
+    reconnects: int = 0
+    last_connect_latency_sec: float = 0.0
+    replayed_frames: int = 0
+    dropped_frames: int = 0
+    keepalives: int = 0
+
 class DeepGramSTT():
-    def __init__(self, emitter: Optional[Any] = None):
+    def __init__(
+        self,
+        emitter: Optional[Any] = None,
+        audio_source: Optional[RingReader] = None,
+        poll_interval_sec: float = 0.02,
+        frame_ms: int = 80,
+        replay_buffer_sec: float = 5.0,
+        keepalive_interval_sec: float = 3.0,
+        reconnect_backoff_sec: float = 0.25,
+        max_reconnect_backoff_sec: float = 8.0,
+        turn_policy: TurnPolicy = TURN_POLICIES["balanced"],
+    ):
         """emitter: a QObject-like with a `transcript` pyqtSignal(str) attribute.
         The emitter should live in the Qt main thread so emitting from the
         async thread will queue the signal correctly into the GUI thread.
+
+        audio_source: optional reader on the mic's AudioRingBuffer. When set,
+        audio is pulled from the ring every `poll_interval_sec` inside the
+        event loop instead of being pushed through `process_audio_chunk`.
+
+        Audio is converted to PCM16 and coalesced into `frame_ms` frames,
+        which a single sender coroutine drains from an asyncio queue.
+
+        The websocket is managed as a long-lived session: it is kept alive
+        across turns, reconnected with exponential backoff when it drops,
+        and up to `replay_buffer_sec` of audio queued during the gap is
+        sent once the new connection is up.
+
+        turn_policy: the active turn-taking policy; its end-of-turn
+        thresholds are sent to Flux, which only emits EagerEndOfTurn when
+        an eager threshold is set.
         """
         self.client = AsyncDeepgramClient(api_key=os.getenv("DEEPGRAM_API_KEY"))
         self.connection = None
         self.loop = None
         self.emitter = emitter
+        self.audio_source = audio_source
+        self.poll_interval_sec = poll_interval_sec
+        self.framer = PCM16Framer(sample_rate=16000, frame_ms=frame_ms)
+        self.max_queued_frames = max(1, int(replay_buffer_sec * 1000 / frame_ms))
+        self.turn_policy = turn_policy
+        self.frames: Optional[asyncio.Queue] = None
+
+        self.keepalive_interval_sec = keepalive_interval_sec
+        self.reconnect_backoff_sec = reconnect_backoff_sec
+        self.max_reconnect_backoff_sec = max_reconnect_backoff_sec
+        self._keepalive_frame = bytes(self.framer.frame_samples * 2)  # PCM16 silence
+        self._connected: Optional[asyncio.Event] = None
+        self._last_send = 0.0
+        self.paused = False
+        self.stats = STTSessionStats()
 
     async def start(self):
         # Capture the loop from the main thread
         self.loop = asyncio.get_running_loop()
+        self.frames = asyncio.Queue(maxsize=self.max_queued_frames)
+        self._connected = asyncio.Event()
+
+        tasks = [asyncio.create_task(self._sender())]
+        if self.audio_source is not None:
+            # Audio captured while the socket was connecting is still in
+            # the ring, so the first words of the turn are not lost.
+            tasks.append(asyncio.create_task(self._pump_audio()))
+
+        try:
+            await self._run_session()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _run_session(self):
+        """Keep a connection up for as long as we are running."""
+        assert self.loop is not None and self._connected is not None
+        backoff = self.reconnect_backoff_sec
+
+        while True:
+            started = self.loop.time()
+            try:
+                async with self.client.listen.v2.connect(**self._connect_options()) as connection:
+                    self.stats.last_connect_latency_sec = self.loop.time() - started
+                    self.stats.connects += 1
+                    print(f"🔌 Deepgram connected in {self.stats.last_connect_latency_sec * 1000:.0f} ms "
+                          f"(reconnects: {self.stats.reconnects})")
+
+                    self.connection = connection
+
+                    self.connection.on(EventType.MESSAGE, self.on_transcript)
+                    self.connection.on(EventType.CLOSE, lambda _: print("❌ Deepgram closed"))
+                    self.connection.on(EventType.ERROR, lambda e: print("Error:", e))
+
+                    backlog = self.frames.qsize() if self.frames else 0
+                    if backlog:
+                        self.stats.replayed_frames += backlog
+                        print(f"↻ Replaying {backlog} buffered audio frames")
+
+                    self._last_send = self.loop.time()
+                    self._connected.set()
+                    keepalive_task = asyncio.create_task(self._keepalive())
+                    try:
+                        await self.connection.start_listening()
+                    finally:
+                        keepalive_task.cancel()
+                        self._connected.clear()
+                        self.connection = None
 
-        async with self.client.listen.v2.connect(
-            model="flux-general-en",
-            encoding="linear16",
-            sample_rate="16000"
-        ) as connection:
-            self.connection = connection
+                # A session that lived normally resets the backoff
+                backoff = self.reconnect_backoff_sec
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Deepgram connection failed: {e}")
 
-            self.connection.on(EventType.MESSAGE, self.on_transcript)
-            self.connection.on(EventType.OPEN, lambda _: print("🔌 Deepgram connected"))
-            self.connection.on(EventType.CLOSE, lambda _: print("❌ Deepgram closed"))
-            self.connection.on(EventType.ERROR, lambda e: print("Error:", e))
+            self.stats.reconnects += 1
+            print(f"↻ Reconnecting to Deepgram in {backoff:.2f}s")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_reconnect_backoff_sec)
 
-            # Start listening background task
-            listen_task = asyncio.create_task(self.connection.start_listening())
+    def _connect_options(self) -> dict:
+        """Flux settings; end-of-turn thresholds follow the turn policy."""
+        options = {
+            "model": "flux-general-en",
+            "encoding": "linear16",
+            "sample_rate": "16000",
+            "eot_threshold": str(self.turn_policy.eot_threshold),
+        }
+        if self.turn_policy.eager_eot_threshold is not None:
+            options["eager_eot_threshold"] = str(self.turn_policy.eager_eot_threshold)
+        return options
 
-            await listen_task
+    async def _keepalive(self):
+        """Send a frame of silence whenever the socket has been idle too long."""
+        assert self.loop is not None
+        while True:
+            await asyncio.sleep(self.keepalive_interval_sec / 2)
+            if self.loop.time() - self._last_send >= self.keepalive_interval_sec:
+                try:
+                    await self._send_audio(self._keepalive_frame)
+                    self.stats.keepalives += 1
+                except Exception as e:
+                    print(f"Deepgram keepalive failed: {e}")
+
+    async def _pump_audio(self):
+        """Drain the mic ring buffer at our own cadence and forward it."""
+        assert self.audio_source is not None
+        while True:
+            if self.paused:
+                # The mic keeps running (barge-in monitoring); the
+                # assistant's own voice is not for the transcriber
+                self.audio_source.skip_to_latest()
+            else:
+                chunk = self.audio_source.read()
+                if len(chunk):
+                    self._enqueue_audio(chunk)
+            await asyncio.sleep(self.poll_interval_sec)
+
+    def pause(self):
+        """Stop forwarding ring audio; the session stays up on keepalives."""
+        self.paused = True
+
+    def resume(self, preroll_sec: float = 0.0):
+        """
+        Forward ring audio again.
+
+        Args:
+            preroll_sec: Audio from just before the resume to send as well,
+                so the words that triggered a barge-in are transcribed.
+        """
+        # Called from the GUI thread; the ring reader belongs to the pump on
+        # the event loop, so move it there
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._resume, preroll_sec)
+        else:
+            self._resume(preroll_sec)
+
+    def _resume(self, preroll_sec: float):
+        if self.audio_source is not None:
+            self.audio_source.skip_to_latest()
+            self.audio_source.rewind(int(preroll_sec * self.framer.sample_rate))
+        self.paused = False
+
+    def _enqueue_audio(self, chunk: np.ndarray):
+        """Frame audio and queue it for the sender. Runs on the event loop."""
+        assert self.frames is not None
+        for frame in self.framer.push(chunk):
+            if self.frames.full():
+                # Replay buffer is full (long outage); drop the oldest frame
+                self.frames.get_nowait()
+                self.stats.dropped_frames += 1
+            self.frames.put_nowait(frame)
+
+    async def _sender(self):
+        """The one long-running coroutine that writes frames to the socket."""
+        assert self.frames is not None and self._connected is not None
+        frame = None
+        while True:
+            if frame is None:
+                frame = await self.frames.get()
+
+            # While reconnecting, frames simply wait in the queue
+            await self._connected.wait()
+            try:
+                await self._send_audio(frame)
+                frame = None
+            except Exception as e:
+                # Keep the frame; the session loop will notice the dead
+                # socket and reconnect
+                print(f"Deepgram send failed: {e}")
+                await asyncio.sleep(self.reconnect_backoff_sec)
 
     def on_transcript(self, msg: ListenV2SocketClientResponse):
         # msg may be a pydantic model with attributes like `transcript`, `words`,
-        # and `end_of_turn_confidence`. Safely extract `transcript`.
-        transcript = None
-        if hasattr(msg, "transcript"):
-            transcript = getattr(msg, "transcript")
-        elif isinstance(msg, dict):
-            transcript = msg.get("transcript")
+        # `event` and `end_of_turn_confidence`. Safely extract them.
+        transcript = self._field(msg, "transcript")
+        event = self._field(msg, "event")
+        confidence = self._field(msg, "end_of_turn_confidence") or 0.0
 
         if transcript:
             print("🗣️", transcript)
@@ -59,14 +249,37 @@ class DeepGramSTT():
                 # Don't let UI emission errors break STT loop; just log.
                 print("Failed to emit transcript to emitter")
 
+        if event:
+            # Flux turn info (StartOfTurn, Update, EagerEndOfTurn,
+            # TurnResumed, EndOfTurn) drives end-of-turn detection
+            try:
+                if self.emitter is not None and hasattr(self.emitter, "turn_event"):
+                    self.emitter.turn_event.emit(str(event), float(confidence), transcript or "")
+            except Exception:
+                print("Failed to emit turn event to emitter")
+
+    @staticmethod
+    def _field(msg: Any, name: str):
+        if hasattr(msg, name):
+            return getattr(msg, name)
+        if isinstance(msg, dict):
+            return msg.get(name)
+        return None
+
     async def _send_audio(self, chunk):
-        if self.connection:
-            # Use the public send_media helper which will route binary audio
-            # to the websocket correctly.
-            await self.connection.send_media(chunk)
+        connection = self.connection
+        if connection is None:
+            # Dropped between `_connected` and now; the sender keeps the
+            # frame at the head of its queue and resends after reconnecting
+            raise ConnectionError("Deepgram is not connected")
+        # Use the public send_media helper which will route binary audio
+        # to the websocket correctly.
+        await connection.send_media(chunk)
+        if self.loop:
+            self._last_send = self.loop.time()
 
     def process_audio_chunk(self, chunk):
-        pcm16 = (chunk * 32767).astype(np.int16).tobytes()
-        # Use the captured loop to schedule the coroutine
+        # Push-style entry point for callers on other threads. Copy, since
+        # the caller may reuse its buffer before the loop gets to it.
         if self.loop:
-            self.loop.call_soon_threadsafe(asyncio.create_task, self._send_audio(pcm16))
\ No newline at end of file
+            self.loop.call_soon_threadsafe(self._enqueue_audio, np.array(chunk, dtype=np.float32))
\ No newline at end of file
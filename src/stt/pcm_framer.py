@@ -0,0 +1,51 @@
+from typing import Iterator, Optional
+
+import numpy as np
+
+
+class PCM16Framer:
+    """
+    Converts float audio to little-endian PCM16 and coalesces it into
+    fixed-size frames for the STT websocket.
+
+    Conversion happens in place into reusable buffers; the only allocation
+    per frame is the final `bytes` payload handed to the sender.
+    """
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 80):
+        """
+        Args:
+            sample_rate: Sample rate of the incoming float audio.
+            frame_ms: Duration of each emitted frame (40-100 ms works well).
+        """
+        self.sample_rate = sample_rate
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self._scratch = np.empty(self.frame_samples, dtype=np.float32)
+        self._frame = np.empty(self.frame_samples, dtype="<i2")
+        self._fill = 0
+
+    def push(self, chunk: np.ndarray) -> Iterator[bytes]:
+        """Add float samples in [-1, 1]; yields every frame that got completed."""
+        offset = 0
+        while offset < len(chunk):
+            take = min(self.frame_samples - self._fill, len(chunk) - offset)
+            scratch = self._scratch[:take]
+            np.multiply(chunk[offset:offset + take], 32767, out=scratch)
+            np.clip(scratch, -32768, 32767, out=scratch)
+            self._frame[self._fill:self._fill + take] = scratch
+            self._fill += take
+            offset += take
+
+            if self._fill == self.frame_samples:
+                self._fill = 0
+                yield self._frame.tobytes()
+
+    def flush(self) -> Optional[bytes]:
+        """Return the partially filled frame, if any."""
+        if not self._fill:
+            return None
+        frame = self._frame[:self._fill].tobytes()
+        self._fill = 0
+        return frame
+
+    def reset(self) -> None:
+        self._fill = 0
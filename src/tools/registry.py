@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, Optional
 
 @dataclass
 class ToolDef:
@@ -7,9 +7,19 @@ class ToolDef:
     description: str
     parameters: Dict[str, Any]  # JSON Schema
     func: Callable[..., Any]
+    # Calls of this tool allowed to run at the same time (None: no limit)
+    max_concurrency: Optional[int] = None
 
 
 TOOL_REGISTRY: Dict[str, ToolDef] = {}
 
+# Bumped on every registry change so providers can cache their declarations
+_REGISTRY_VERSION = 0
+
 def register_tool(tool: ToolDef):
+    global _REGISTRY_VERSION
     TOOL_REGISTRY[tool.name] = tool
+    _REGISTRY_VERSION += 1
+
+def registry_version() -> int:
+    return _REGISTRY_VERSION
@@ -1,4 +1,6 @@
-from typing import Any
+from typing import Tuple
+
+import numpy as np
 
 class BaseTTS:
     """
@@ -9,10 +11,41 @@ class BaseTTS:
     """
     
     name: str
+
+    # Voice/model identifier; part of the audio cache key
+    voice: str = ""
+
+    # Rate of the audio returned by `synthesize`
+    sample_rate: int
     
+    def synthesize(self, text: str) -> np.ndarray:
+        """
+        Generate audio for the text without playing it:
+        - mono float32 samples at `sample_rate`
+        """
+        raise NotImplementedError
+
+    def set_voice(self, voice: str) -> None:
+        """Switch to another voice of the same engine."""
+        self.voice = voice
+
+    def voice_and_rate(self) -> Tuple[str, int]:
+        """
+        `voice` and `sample_rate` as one consistent pair; engines that switch
+        voices while synthesizing override this.
+        """
+        return self.voice, self.sample_rate
+
     def speak(self, text: str) -> None:
         """
         Generate sound from the text:
-        - stream the audio returned to speakers
+        - play it through the shared playback service, after anything
+          already queued, and block until it has been played
         """
-        raise NotImplementedError
\ No newline at end of file
+        from src.tts.playback import get_playback
+
+        try:
+            audio = self.synthesize(text)
+            get_playback().play(audio, self.sample_rate).done.wait()
+        except Exception as e:
+            print(f"error: {e}")
@@ -0,0 +1,257 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+from src.lib.config_manager import ConfigManager
+from src.tts.base import BaseTTS
+
+TTS_CACHE_DIR = ConfigManager.CONFIG_FOLDER / "tts_cache"
+
+_QUOTES = str.maketrans({"‘": "'", "’": "'", "“": '"', "”": '"'})
+_WHITESPACE = re.compile(r"\s+")
+
+
+def speech_text_key(text: str) -> str:
+    """
+    Canonical form of text to be spoken. Unlike `normalize_text`, case and
+    punctuation are kept: they change how the sentence sounds.
+    """
+    return _WHITESPACE.sub(" ", text.translate(_QUOTES)).strip()
+
+
+def tts_cache_key(provider: str, voice: str, sample_rate: int, text: str) -> str:
+    """Stable hash of everything that determines the synthesized audio."""
+    payload = json.dumps(
+        {"provider": provider, "voice": voice, "rate": sample_rate, "text": speech_text_key(text)},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@dataclass
+class TTSCacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+
+
+class TTSCache:
+    """
+    Two-level store of synthesized audio (mono float32 PCM): an in-memory
+    LRU in front of one .npy file per entry under `directory`. Both levels
+    are capped in bytes; the disk evicts the least recently used files.
+    """
+
+    def __init__(
+        self,
+        directory: Path = TTS_CACHE_DIR,
+        max_memory_bytes: int = 32 * 1024 * 1024,
+        max_disk_bytes: int = 256 * 1024 * 1024
+    ):
+        """
+        Args:
+            directory: Where entries are persisted (None for memory only).
+            max_memory_bytes: Audio kept in memory.
+            max_disk_bytes: Audio kept on disk.
+        """
+        self.directory = Path(directory) if directory is not None else None
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.stats = TTSCacheStats()
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._memory_bytes = 0
+        # Measured on the first write
+        self._disk_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        assert self.directory is not None
+        return self.directory / f"{key}.npy"
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.stats.memory_hits += 1
+                return audio
+
+        audio = self._load(key)
+        with self._lock:
+            if audio is None:
+                self.stats.misses += 1
+                return None
+            self.stats.disk_hits += 1
+            self._remember(key, audio)
+        return audio
+
+    def set(self, key: str, audio: np.ndarray) -> np.ndarray:
+        """Store audio; returns the read-only array that is now cached."""
+        audio = np.array(audio, dtype=np.float32)
+        audio.flags.writeable = False
+        with self._lock:
+            self._remember(key, audio)
+        self._save(key, audio)
+        return audio
+
+    def contains(self, key: str) -> bool:
+        with self._lock:
+            if key in self._memory:
+                return True
+        return self.directory is not None and self._path(key).exists()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._disk_bytes = 0
+        if self.directory is not None:
+            for path in self.directory.glob("*.npy"):
+                path.unlink(missing_ok=True)
+
+    def _remember(self, key: str, audio: np.ndarray) -> None:
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous.nbytes
+        self._memory[key] = audio
+        self._memory_bytes += audio.nbytes
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.nbytes
+
+    def _load(self, key: str) -> Optional[np.ndarray]:
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            audio = np.load(path, allow_pickle=False)
+            # Recency for eviction
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        audio.flags.writeable = False
+        return audio
+
+    def _save(self, key: str, audio: np.ndarray) -> None:
+        if self.directory is None:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            # Write then rename so a concurrent reader never sees half a file
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, audio, allow_pickle=False)
+            tmp.replace(path)
+            with self._lock:
+                if self._disk_bytes is None:
+                    self._disk_bytes = sum(p.stat().st_size for p in self.directory.glob("*.npy"))
+                else:
+                    self._disk_bytes += path.stat().st_size
+                over = self._disk_bytes > self.max_disk_bytes
+            if over:
+                self._evict_disk()
+        except OSError as e:
+            print(f"Failed to write TTS cache entry: {e}")
+
+    def _evict_disk(self) -> None:
+        assert self.directory is not None
+        entries = []
+        for path in self.directory.glob("*.npy"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        # Trim to 90% so eviction does not run on every write
+        target = int(self.max_disk_bytes * 0.9)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        with self._lock:
+            self._disk_bytes = total
+
+
+class CachedTTS(BaseTTS):
+    """
+    Wraps an engine with a TTSCache, keyed by provider, voice, sample rate
+    and text, so repeated phrases skip synthesis (or the network) entirely.
+    """
+
+    def __init__(self, tts: BaseTTS, cache: Optional[TTSCache] = None):
+        self.tts = tts
+        self.name = getattr(tts, "name", type(tts).__name__)
+        self.cache = cache or TTSCache()
+
+    # Follow the engine, which may switch voices (and rates) at runtime
+    @property
+    def voice(self) -> str:
+        return self.tts.voice
+
+    @property
+    def sample_rate(self) -> int:
+        return self.tts.sample_rate
+
+    def set_voice(self, voice: str) -> None:
+        self.tts.set_voice(voice)
+
+    def voice_and_rate(self) -> Tuple[str, int]:
+        return self.tts.voice_and_rate()
+
+    def _key(self, text: str) -> str:
+        # A voice switch in between must not pair one voice with the other's rate
+        voice, sample_rate = self.voice_and_rate()
+        return tts_cache_key(self.name, voice, sample_rate, text)
+
+    def synthesize(self, text: str) -> np.ndarray:
+        key = self._key(text)
+        audio = self.cache.get(key)
+        if audio is not None:
+            return audio
+        return self.cache.set(key, self.tts.synthesize(text))
+
+    def warm_up(self, phrases: Iterable[str], background: bool = True) -> Optional[threading.Thread]:
+        """
+        Pre-render `phrases` that are not cached yet, so they start playing
+        without any synthesis latency. Runs on a daemon thread by default.
+        """
+        phrases = [p for p in dict.fromkeys(phrases) if p and p.strip()]
+
+        def render():
+            rendered = 0
+            for phrase in phrases:
+                try:
+                    key = self._key(phrase)
+                    if self.cache.contains(key):
+                        continue
+                    self.cache.set(key, self.tts.synthesize(phrase))
+                    rendered += 1
+                except FileNotFoundError as e:
+                    # Voice not installed; every phrase would fail the same way
+                    print(f"TTS warm-up skipped: {e}")
+                    break
+                except Exception as e:
+                    print(f"TTS warm-up failed for {phrase!r}: {e}")
+            if rendered:
+                print(f"🔥 Pre-rendered {rendered} phrase(s) for {self.name}")
+
+        if not background:
+            render()
+            return None
+        thread = threading.Thread(target=render, name="tts-warmup", daemon=True)
+        thread.start()
+        return thread
@@ -2,31 +2,33 @@ import os
 from deepgram import DeepgramClient
 from src.tts.base import BaseTTS
 
-import sounddevice as sd
 import soundfile as sf
 from io import BytesIO
 
 class DeepGramTTS(BaseTTS):
+    name = "Deepgram"
+
     def __init__(self):
         self.client = DeepgramClient(api_key=os.getenv("DEEPGRAM_API_KEY"))
-    
-    def speak(self, text):
-        
+        self.voice = "aura-2-thalia-en"
+        self.sample_rate = 24000
+
+    def _generate(self, text) -> bytes:
         chunks = []
         for chunk in self.client.speak.v1.audio.generate(
             text=text,
-            model="aura-2-thalia-en",
+            model=self.voice,
             encoding="linear16",
             container="wav",
+            sample_rate=self.sample_rate,
         ):
             chunks.append(chunk)
 
-        audio_bytes =  b"".join(chunks)
+        return b"".join(chunks)
 
-        try:
-            data, samplerate = sf.read(BytesIO(audio_bytes), dtype="float32")
-            sd.play(data, samplerate)
-            sd.wait()
-        except Exception as e:
-            print(f"error: {e})")
+    def synthesize(self, text):
+        data, _ = sf.read(BytesIO(self._generate(text)), dtype="float32")
+        if data.ndim > 1:
+            data = data[:, 0]
+        return data
            
\ No newline at end of file
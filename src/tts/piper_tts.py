@@ -1,28 +1,66 @@
-from src.tts.base import BaseTTS
+import threading
+from typing import Optional, Tuple
 
-from piper import PiperVoice
-import sounddevice as sd
+from src.tts.base import BaseTTS
+from src.tts.piper_voices import DEFAULT_PIPER_VOICE, PiperVoicePool, get_voice_pool
 
-voice = PiperVoice.load("/media/abdxzi/New Volume/Work/test/risi/models/en_US-lessac-medium.onnx")
+import numpy as np
 
 class PiperTTS(BaseTTS):
-    def __init__(self):
-        self.sample_rate = voice.config.sample_rate
-    
-    def speak(self, text):
+    name = "Piper"
 
+    def __init__(self, voice: str = DEFAULT_PIPER_VOICE, pool: Optional[PiperVoicePool] = None):
+        self.pool = pool or get_voice_pool()
+        # `voice` and its sample rate change together
+        self._lock = threading.Lock()
+        self._voice = voice
+        self._sample_rate: Optional[int] = None
+        self.set_voice(voice)
+
+    def _read_sample_rate(self, voice: str) -> Optional[int]:
         try:
-            audio_chunks = voice.synthesize(text)
-            with sd.OutputStream(
-                    samplerate=self.sample_rate,
-                    channels=1,
-                    dtype="float32"
-                ) as stream:
-                    for chunk in audio_chunks:
-                        # Your chunk contains audio_float_array, not audio
-                        stream.write(chunk.audio_float_array)
-        except Exception as e:
-            print(f"error: {e})")
-           
-
-# python3 -m piper.download_voices en_US-lessac-medium
\ No newline at end of file
+            return self.pool.config(voice).sample_rate
+        except FileNotFoundError:
+            print(f"⚠️ Piper voice {voice} not found in {self.pool.models_dir}; "
+                  f"download it there or set PIPER_MODELS_DIR")
+            return None
+
+    def set_voice(self, voice: str) -> None:
+        # A missing voice is not fatal here; it is looked up again when
+        # first needed, so it can be downloaded while the app runs
+        sample_rate = self._read_sample_rate(voice)
+        with self._lock:
+            self._voice = voice
+            self._sample_rate = sample_rate
+        if sample_rate is not None:
+            # The model loads in the background; the first `synthesize` waits for it
+            self.pool.preload(voice)
+
+    def voice_and_rate(self) -> Tuple[str, int]:
+        """The current voice and its sample rate, read together."""
+        with self._lock:
+            voice, sample_rate = self._voice, self._sample_rate
+        if sample_rate is None:
+            sample_rate = self._read_sample_rate(voice)
+            if sample_rate is None:
+                raise FileNotFoundError(f"Piper voice {voice} not found; set PIPER_MODELS_DIR")
+            with self._lock:
+                if self._voice == voice:
+                    self._sample_rate = sample_rate
+        return voice, sample_rate
+
+    @property
+    def voice(self) -> str:
+        with self._lock:
+            return self._voice
+
+    @property
+    def sample_rate(self) -> int:
+        return self.voice_and_rate()[1]
+
+    def synthesize(self, text):
+        voice, _ = self.voice_and_rate()
+        chunks = [chunk.audio_float_array for chunk in self.pool.get(voice).synthesize(text)]
+        if not chunks:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(chunks).astype(np.float32, copy=False)
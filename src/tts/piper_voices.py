@@ -0,0 +1,161 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import onnxruntime
+from piper import PiperVoice
+from piper.config import PiperConfig
+
+from src.lib.config_manager import ConfigManager
+
+# Voices are looked up as <models dir>/<voice>.onnx (+ .onnx.json). Fetch one with
+#   python3 -m piper.download_voices --download-dir ~/.config/risi/models en_US-lessac-medium
+PIPER_MODELS_DIR = Path(os.environ.get("PIPER_MODELS_DIR") or ConfigManager.CONFIG_FOLDER / "models")
+DEFAULT_PIPER_VOICE = os.environ.get("PIPER_VOICE", "en_US-lessac-medium")
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+
+class PiperVoicePool:
+    """
+    Loads Piper voices on demand and keeps the most recently used ones.
+
+    Loading happens on a background thread: `preload` starts it without
+    waiting, `get` waits for it (sharing an in-flight load rather than
+    starting a second one). Loaded voices are kept in an LRU capped by
+    `max_memory_bytes`, estimated from the size of each .onnx file.
+    """
+    def __init__(
+        self,
+        models_dir: Path = PIPER_MODELS_DIR,
+        max_memory_bytes: int = 512 * 1024 * 1024,
+        intra_op_threads: Optional[int] = None,
+        inter_op_threads: Optional[int] = None
+    ):
+        """
+        Args:
+            models_dir: Where <voice>.onnx files live.
+            max_memory_bytes: Model bytes kept loaded (the most recently
+                used voice always stays).
+            intra_op_threads: ONNX Runtime threads within an operator
+                (PIPER_INTRA_OP_THREADS; runtime default when unset).
+            inter_op_threads: ONNX Runtime threads across operators
+                (PIPER_INTER_OP_THREADS; runtime default when unset).
+        """
+        self.models_dir = Path(models_dir)
+        self.max_memory_bytes = max_memory_bytes
+        self.intra_op_threads = intra_op_threads if intra_op_threads is not None else _env_int("PIPER_INTRA_OP_THREADS")
+        self.inter_op_threads = inter_op_threads if inter_op_threads is not None else _env_int("PIPER_INTER_OP_THREADS")
+
+        self._voices: "OrderedDict[str, PiperVoice]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._loading: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="piper-load")
+
+    def model_path(self, voice: str) -> Path:
+        """`voice` is a name in `models_dir` or a path to an .onnx file."""
+        path = Path(voice).expanduser()
+        if path.suffix == ".onnx":
+            return path
+        return self.models_dir / f"{voice}.onnx"
+
+    def available(self) -> List[str]:
+        """Voices present in `models_dir`."""
+        return sorted(p.stem for p in self.models_dir.glob("*.onnx"))
+
+    def config(self, voice: str) -> PiperConfig:
+        """The voice's config, read without loading the model."""
+        with open(f"{self.model_path(voice)}.json", encoding="utf-8") as f:
+            return PiperConfig.from_dict(json.load(f))
+
+    def loaded(self) -> List[str]:
+        with self._lock:
+            return list(self._voices)
+
+    def preload(self, voice: str) -> Future:
+        """Start loading `voice` in the background if it is not loaded yet."""
+        with self._lock:
+            if voice in self._voices:
+                future: Future = Future()
+                future.set_result(self._voices[voice])
+                return future
+            future = self._loading.get(voice)
+            if future is None:
+                future = self._executor.submit(self._load, voice)
+                self._loading[voice] = future
+            return future
+
+    def get(self, voice: str) -> PiperVoice:
+        """Return the loaded voice, waiting for (or starting) its load."""
+        with self._lock:
+            loaded = self._voices.get(voice)
+            if loaded is not None:
+                self._voices.move_to_end(voice)
+                return loaded
+        return self.preload(voice).result()
+
+    def _session_options(self) -> onnxruntime.SessionOptions:
+        options = onnxruntime.SessionOptions()
+        if self.intra_op_threads:
+            options.intra_op_num_threads = self.intra_op_threads
+        if self.inter_op_threads:
+            options.inter_op_num_threads = self.inter_op_threads
+        return options
+
+    def _load(self, voice: str) -> PiperVoice:
+        path = self.model_path(voice)
+        try:
+            try:
+                loaded = PiperVoice(
+                    session=onnxruntime.InferenceSession(
+                        str(path),
+                        sess_options=self._session_options(),
+                        providers=["CPUExecutionProvider"],
+                    ),
+                    config=self.config(voice),
+                )
+            except TypeError:
+                # PiperVoice fields differ between piper releases; let it
+                # build the session itself (default thread settings)
+                loaded = PiperVoice.load(str(path))
+            print(f"🗣️ Loaded Piper voice {voice}")
+
+            with self._lock:
+                self._voices[voice] = loaded
+                self._sizes[voice] = path.stat().st_size
+                self._evict(keep=voice)
+            return loaded
+        finally:
+            with self._lock:
+                self._loading.pop(voice, None)
+
+    def _evict(self, keep: str) -> None:
+        total = sum(self._sizes[v] for v in self._voices)
+        for voice in list(self._voices):
+            if total <= self.max_memory_bytes:
+                break
+            if voice == keep:
+                continue
+            del self._voices[voice]
+            total -= self._sizes.pop(voice)
+            print(f"🗣️ Unloaded Piper voice {voice}")
+
+
+_POOL: Optional[PiperVoicePool] = None
+_POOL_LOCK = threading.Lock()
+
+def get_voice_pool() -> PiperVoicePool:
+    """The process-wide Piper voice pool, created on first use."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = PiperVoicePool()
+        return _POOL
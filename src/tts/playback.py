@@ -0,0 +1,220 @@
+import heapq
+import itertools
+import threading
+from dataclasses import dataclass, field
+from math import gcd
+from typing import Any, Callable, List, Optional
+
+import numpy as np
+import sounddevice as sd
+from scipy.signal import resample_poly
+
+# Utterance priorities; lower plays first
+URGENT = 0
+NORMAL = 10
+
+
+@dataclass
+class Utterance:
+    audio: np.ndarray
+    priority: int = NORMAL
+    # Whoever queued it (e.g. a SpeechPipeline), for flushing only their audio
+    owner: Any = None
+    done: threading.Event = field(default_factory=threading.Event)
+    cancelled: bool = False
+    on_done: List[Callable[["Utterance"], None]] = field(default_factory=list)
+
+
+class PlaybackService:
+    """
+    The one place audio reaches the speakers.
+
+    Owns a single persistent output stream and plays queued utterances one
+    at a time, by priority and then in the order they were queued ("play
+    after"). `interrupt` cuts off what is playing, `flush` drops what is
+    queued, and `idle` is set whenever nothing is queued or playing, so the
+    UI can wait for it before reopening the mic.
+
+    The stream is opened at the rate of the first utterance; audio at other
+    rates is resampled to it. `output_level` is the mean-square level of the
+    block being written (0 when silent), the echo reference for barge-in.
+    """
+    def __init__(self, block_ms: int = 20):
+        """
+        Args:
+            block_ms: Write size; interrupts take effect between blocks,
+                and audio already buffered by the device is discarded.
+        """
+        self.block_ms = block_ms
+        self.sample_rate: Optional[int] = None
+        self._stream: Optional[sd.OutputStream] = None
+
+        self._queue: list = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._current: Optional[Utterance] = None
+        self._running = True
+        self.output_level = 0.0
+        self.idle = threading.Event()
+        self.idle.set()
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def play(
+        self,
+        audio: np.ndarray,
+        sample_rate: int,
+        priority: int = NORMAL,
+        owner: Any = None,
+        interrupt: bool = False,
+        on_done: Optional[Callable[[Utterance], None]] = None
+    ) -> Utterance:
+        """
+        Queue audio for playback.
+
+        Args:
+            audio: Mono float32 samples.
+            sample_rate: Rate of `audio`.
+            priority: URGENT jumps ahead of NORMAL utterances.
+            owner: Tag used by `flush`/`stop`.
+            interrupt: Flush everything and cut off the current utterance
+                so this plays right away.
+            on_done: Called (on the playback thread) once it finished or
+                was dropped; check `utterance.cancelled`.
+
+        Returns:
+            The Utterance; wait on `utterance.done` for it to finish.
+        """
+        with self._cond:
+            if self.sample_rate is None:
+                self.sample_rate = sample_rate
+
+        utterance = Utterance(self._to_stream_rate(audio, sample_rate), priority, owner)
+        if on_done:
+            utterance.on_done.append(on_done)
+
+        if interrupt:
+            self.stop()
+
+        with self._cond:
+            heapq.heappush(self._queue, (priority, next(self._seq), utterance))
+            self.idle.clear()
+            self._cond.notify()
+        return utterance
+
+    def interrupt(self, owner: Any = None) -> None:
+        """Cut off the utterance being played (only if it is `owner`'s, when given)."""
+        with self._cond:
+            current = self._current
+            if current is not None and (owner is None or current.owner is owner):
+                current.cancelled = True
+
+    def flush(self, owner: Any = None) -> None:
+        """Drop queued utterances (only `owner`'s, when given)."""
+        with self._cond:
+            keep, dropped = [], []
+            for item in self._queue:
+                (dropped if owner is None or item[2].owner is owner else keep).append(item)
+            self._queue = keep
+            heapq.heapify(self._queue)
+            if not self._queue and self._current is None:
+                self.idle.set()
+
+        for _, _, utterance in dropped:
+            utterance.cancelled = True
+            self._finish(utterance)
+
+    def stop(self, owner: Any = None) -> None:
+        """Flush and interrupt."""
+        self.flush(owner)
+        self.interrupt(owner)
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        return self.idle.wait(timeout)
+
+    def is_playing(self) -> bool:
+        return not self.idle.is_set()
+
+    def close(self) -> None:
+        self.stop()
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def _to_stream_rate(self, audio: np.ndarray, sample_rate: int) -> np.ndarray:
+        audio = np.asarray(audio, dtype=np.float32)
+        if self.sample_rate is None or sample_rate == self.sample_rate:
+            return audio
+        g = gcd(self.sample_rate, sample_rate)
+        return resample_poly(audio, self.sample_rate // g, sample_rate // g).astype(np.float32)
+
+    def _output_stream(self) -> sd.OutputStream:
+        if self._stream is None:
+            self._stream = sd.OutputStream(
+                samplerate=self.sample_rate,
+                channels=1,
+                dtype="float32",
+                # Little audio buffered past the block being written, so
+                # an interrupt is heard right away
+                latency="low"
+            )
+            self._stream.start()
+        return self._stream
+
+    def _finish(self, utterance: Utterance) -> None:
+        utterance.done.set()
+        for callback in utterance.on_done:
+            try:
+                callback(utterance)
+            except Exception as e:
+                print(f"error: {e}")
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._queue:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                _, _, utterance = heapq.heappop(self._queue)
+                self._current = utterance
+
+            try:
+                stream = self._output_stream()
+                block = max(1, self.sample_rate * self.block_ms // 1000)
+                for start in range(0, len(utterance.audio), block):
+                    if utterance.cancelled:
+                        break
+                    samples = utterance.audio[start:start + block]
+                    self.output_level = float(np.mean(np.square(samples)))
+                    stream.write(samples)
+                if utterance.cancelled:
+                    # Discard what the device has buffered instead of
+                    # letting it play out
+                    stream.abort()
+                    stream.start()
+            except Exception as e:
+                print(f"error: {e}")
+            finally:
+                self.output_level = 0.0
+                with self._cond:
+                    self._current = None
+                    if not self._queue:
+                        self.idle.set()
+                self._finish(utterance)
+
+
+_PLAYBACK: Optional[PlaybackService] = None
+_PLAYBACK_LOCK = threading.Lock()
+
+def get_playback() -> PlaybackService:
+    """The process-wide playback service, created on first use."""
+    global _PLAYBACK
+    with _PLAYBACK_LOCK:
+        if _PLAYBACK is None:
+            _PLAYBACK = PlaybackService()
+        return _PLAYBACK
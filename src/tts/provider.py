@@ -1,20 +1,42 @@
+import importlib
+import threading
 from typing import Optional, Type, Dict
 from .base import BaseTTS
-from .piper_tts import PiperTTS
-from .deepgram_tts import DeepGramTTS
+from .cache import CachedTTS, TTSCache
 
-TTS_PROVIDER_MAP: Dict[str, Type[BaseTTS]] = {
-    "piperTTS": PiperTTS,
-    "deepgramTTS": DeepGramTTS
+# "module:Class", imported on first use so only the engine in use needs its SDK
+TTS_PROVIDER_MAP: Dict[str, str] = {
+    "piperTTS": "src.tts.piper_tts:PiperTTS",
+    "deepgramTTS": "src.tts.deepgram_tts:DeepGramTTS"
 }
 
+def tts_class(provider: str) -> Type[BaseTTS]:
+    module, _, name = TTS_PROVIDER_MAP[provider].partition(":")
+    return getattr(importlib.import_module(module), name)
+
+# One engine per provider for the whole process (model loads, API clients),
+# all sharing one audio cache
+_TTS_POOL: Dict[str, CachedTTS] = {}
+_TTS_POOL_LOCK = threading.Lock()
+_TTS_CACHE: Optional[TTSCache] = None
+
+def get_tts(provider: str) -> CachedTTS:
+    """Return the pooled (cached) TTS engine for `provider`, creating it once."""
+    global _TTS_CACHE
+    with _TTS_POOL_LOCK:
+        tts = _TTS_POOL.get(provider)
+        if tts is None:
+            if _TTS_CACHE is None:
+                _TTS_CACHE = TTSCache()
+            ProviderClass = tts_class(provider)
+            tts = CachedTTS(ProviderClass(), _TTS_CACHE)
+            _TTS_POOL[provider] = tts
+        return tts
+
 class TTSProvider():
 
     def __init__(self, provider: str):
-        
-        ProviderClass = TTS_PROVIDER_MAP[provider]
-
-        self.tts = ProviderClass()
+        self.tts = get_tts(provider)
     
     def speak(self, text: str) -> None:
         self.tts.speak(text)
\ No newline at end of file
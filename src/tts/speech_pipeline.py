@@ -0,0 +1,183 @@
+import queue
+import threading
+import time
+from typing import Optional, Tuple
+
+from src.lib.text import pop_sentences, speech_chunks
+from src.tts.base import BaseTTS
+from src.tts.playback import NORMAL, PlaybackService, get_playback
+
+
+class SpeechPipeline:
+    """
+    Two-stage speech output: a synthesis worker turns chunk N+1 into audio
+    while the shared PlaybackService plays chunk N.
+
+    Text can be fed incrementally (e.g. straight from a streaming LLM);
+    each complete sentence is split into speakable chunks and queued right
+    away, so time-to-first-audio depends on the first sentence rather than
+    the whole reply.
+    """
+    def __init__(
+        self,
+        tts: BaseTTS,
+        playback: Optional[PlaybackService] = None,
+        max_chunk_chars: int = 160,
+        lookahead: int = 2,
+        priority: int = NORMAL
+    ):
+        """
+        Args:
+            tts: Engine providing `synthesize` and `sample_rate`.
+            playback: Where audio is played (the shared service by default).
+            max_chunk_chars: Longest piece of text synthesized at once.
+            lookahead: Chunks allowed to be queued or playing before
+                synthesis waits.
+            priority: Playback priority of this pipeline's audio.
+        """
+        self.tts = tts
+        self.playback = playback or get_playback()
+        self.max_chunk_chars = max_chunk_chars
+        self.priority = priority
+
+        self._buffer = ""
+        self._text: "queue.Queue[Tuple[int, str]]" = queue.Queue()
+        self._slots = threading.Semaphore(lookahead)
+
+        # Bumped by `cancel`; work queued under an older generation is dropped
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._idle = threading.Event()
+        self._idle.set()
+        self._fed_at: Optional[float] = None
+
+        self._synth_thread = threading.Thread(target=self._synthesize_loop, daemon=True)
+        self._synth_thread.start()
+
+    def feed(self, text: str) -> None:
+        """Add streamed text; complete sentences are queued immediately."""
+        with self._lock:
+            self._buffer += text
+            sentences, self._buffer = pop_sentences(self._buffer)
+        for sentence in sentences:
+            self._queue(sentence)
+
+    def flush(self) -> None:
+        """Queue whatever incomplete sentence is left from `feed`."""
+        with self._lock:
+            rest, self._buffer = self._buffer, ""
+        self._queue(rest)
+
+    def say(self, text: str) -> None:
+        """Queue a complete utterance."""
+        self.feed(text)
+        self.flush()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued so far has been played."""
+        return self._idle.wait(timeout)
+
+    def is_idle(self) -> bool:
+        return self._idle.is_set()
+
+    def cancel(self) -> None:
+        """Drop pending text and audio and cut off the chunk being played."""
+        with self._lock:
+            self._generation += 1
+            self._buffer = ""
+            self._pending = 0
+            self._idle.set()
+        try:
+            while True:
+                self._text.get_nowait()
+        except queue.Empty:
+            pass
+        self.playback.stop(owner=self)
+
+    def _queue(self, text: str) -> None:
+        chunks = speech_chunks(text, self.max_chunk_chars)
+        if not chunks:
+            return
+        with self._lock:
+            if self._idle.is_set():
+                self._fed_at = time.perf_counter()
+            self._pending += len(chunks)
+            self._idle.clear()
+            generation = self._generation
+        for chunk in chunks:
+            self._text.put((generation, chunk))
+
+    def _done(self, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._pending -= 1
+            if self._pending <= 0:
+                self._pending = 0
+                self._idle.set()
+
+    def _synthesize_loop(self):
+        while True:
+            generation, text = self._text.get()
+            if generation != self._generation:
+                continue
+
+            # Stay at most `lookahead` chunks ahead of playback
+            self._slots.acquire()
+            if generation != self._generation:
+                self._slots.release()
+                continue
+
+            try:
+                audio = self.tts.synthesize(text)
+            except Exception as e:
+                print(f"error: {e}")
+                self._slots.release()
+                self._done(generation)
+                continue
+
+            with self._lock:
+                # Checked under the lock so a concurrent `cancel` cannot
+                # miss this chunk
+                if generation != self._generation:
+                    self._slots.release()
+                    continue
+
+                if self._fed_at is not None:
+                    print(f"🔊 First audio after {(time.perf_counter() - self._fed_at) * 1000:.0f} ms")
+                    self._fed_at = None
+
+                self.playback.play(
+                    audio,
+                    self.tts.sample_rate,
+                    priority=self.priority,
+                    owner=self,
+                    on_done=lambda _, generation=generation: self._played(generation)
+                )
+
+    def _played(self, generation: int) -> None:
+        self._slots.release()
+        self._done(generation)
+
+
+class NullSpeech:
+    """SpeechPipeline stand-in that says nothing, for running without TTS."""
+
+    def feed(self, text: str) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+    def say(self, text: str) -> None:
+        pass
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return True
+
+    def is_idle(self) -> bool:
+        return True
+
+    def cancel(self) -> None:
+        pass
@@ -3,9 +3,11 @@ from PyQt6.QtCore import QObject, pyqtSignal
 from PyQt6.QtGui import QColor
 
 from src.stt.deepgram_stt import DeepGramSTT
-from src.agents.router import RouterAgent
+from src.agents.router import RouterAgent, SpeculativeRouter
+from src.agents.summarizer import SummarizerAgent
 
-from src.lib import AsyncQtThread, MicThread, ConversationHistory
+from src.tts.playback import get_playback
+from src.lib import AsyncQtThread, MicThread, BargeInDetector, ContextWindow, AudioRingBuffer, TurnTakingEngine, TurnThread, TurnRequest
 from src.ui import TextDisplay, VoiceVisualizer, ContentArea, RecordButton
 
 class MainWindow(QWidget):
@@ -37,87 +39,247 @@ class MainWindow(QWidget):
 
         self.mic_thread = None
 
+        # 16 kHz mic audio shared by STT, silence detection and the
+        # visualizer; 2 seconds of slack for slow consumers.
+        self.noise_floor = 0.0095
+        self.audio_buffer = AudioRingBuffer(capacity=16000 * 2)
+        self.visualizer.set_audio_source(self.audio_buffer.reader(), threshold=self.noise_floor)
+
         # Track the current full instruction text for LLM processing
         self.current_instruction = ""
+
+        # Ends the user's turn on whichever comes first: the STT's
+        # end-of-turn event or the local VAD's silence detection
+        self.turn_taking = TurnTakingEngine(mode="balanced")
+        self.turn_taking.set_dispatch_callback(self.on_turn_complete)
+
+        # All speech goes through one playback service; turns complete
+        # (and the mic reopens) only once it has gone quiet
+        self.playback = get_playback()
+
+        # Keep the mic open while the assistant speaks and stop it as soon
+        # as the user talks over it; off means the old half-duplex gate.
+        # Audio from just before the interruption is replayed to the STT.
+        self.barge_in = True
+        self.barge_in_preroll_sec = 0.3
+        self._barged_in = False
+        # Set from the end of the user's turn until its response finished;
+        # a barge-in signal arriving outside of it is stale
+        self._responding = False
+
+        # Router, agents, tools and TTS run here, off the GUI thread
+        self.turn_thread = TurnThread(playback_idle=self.playback.idle)
+        self.turn_thread.worker.progress.connect(self.on_turn_progress)
+        self.turn_thread.worker.display.connect(self.content_area_ui.set_content_area_markdown)
+        self.turn_thread.worker.completed.connect(self.on_turn_finished)
+        self.turn_thread.start()
+
+        # Built once and reused for every turn; LLM/TTS clients come from
+        # the shared provider pools. Display updates come from the turn
+        # thread, so they go through a signal.
+        self.router = RouterAgent(self.turn_thread.worker.display.emit)
+
         
-        # Initialize conversation history to maintain context
-        self.conversation_history = ConversationHistory(max_exchanges=20)
+        # Conversation context, kept within a token budget; older exchanges
+        # are folded into a rolling summary in the background
+        self.summarizer = SummarizerAgent()
+        self.conversation_history = ContextWindow(
+            token_budget=3000,
+            keep_recent=6,
+            summarize=self.summarizer.summarize
+        )
 
         # Transcript emitter lives in the main (GUI) thread. DeepGramSTT will
         # emit `transcript` from the async thread and Qt will queue the signal
         # back to the GUI thread safely.
         class TranscriptEmitter(QObject):
             transcript = pyqtSignal(str)
+            turn_event = pyqtSignal(str, float, str)  # event, end-of-turn confidence, transcript
 
         self.transcript_emitter = TranscriptEmitter()
         self.transcript_emitter.transcript.connect(self.on_transcript_received)
+        # Speculation must see the event before the turn-taking engine
+        # (connection order is call order) so EagerEndOfTurn can reuse it
+        self.transcript_emitter.turn_event.connect(self.on_turn_event)
+        self.transcript_emitter.turn_event.connect(self.turn_taking.on_stt_event)
 
-        self.stt_service = DeepGramSTT(emitter=self.transcript_emitter)
+        self.stt_service = DeepGramSTT(
+            emitter=self.transcript_emitter,
+            audio_source=self.audio_buffer.reader(),
+            turn_policy=self.turn_taking.policy
+        )
         # Pass the coroutine *factory* (callable) so the coroutine is created
         # inside the async thread's event loop and not before the thread starts.
         self.stt_thread = AsyncQtThread(self.stt_service.start)
 
+        # Routes stable interim transcripts ahead of the end of turn. The
+        # router calls run on the STT event loop, which is live whenever
+        # interim transcripts are arriving.
+        self.speculator = SpeculativeRouter(self.stt_thread.submit, stable_updates=2)
+
     def start_mic(self):
-        self.mic_thread = MicThread(noise_floor=0.0095, sensitivity=40, silence_duration_sec=1.0)
-        
         # Reset instruction state
         self.current_instruction = ""
+        self.turn_taking.reset()
+
+        if self.mic_thread is not None and self.mic_thread.is_running():
+            # The capture stream is already open; just lift the gate
+            self.mic_thread.unmute()
+            return
+
+        barge_in = None
+        if self.barge_in:
+            barge_in = BargeInDetector(
+                echo_level=lambda: self.playback.output_level,
+                energy_threshold=self.noise_floor
+            )
+
+        self.mic_thread = MicThread(
+            self.audio_buffer,
+            noise_floor=self.noise_floor,
+            silence_duration_sec=self.turn_taking.policy.vad_silence_sec,
+            barge_in=barge_in
+        )
         
         # connect signals
         assert self.mic_thread.worker is not None
-        self.mic_thread.worker.volume_signal.connect(self.process_volume)
-        self.mic_thread.worker.voice_signal.connect(self.stt_service.process_audio_chunk)
         self.mic_thread.worker.silence_signal.connect(self.on_silence_detected)
+        self.mic_thread.worker.barge_in_signal.connect(self.on_barge_in)
         
         self.mic_thread.start()
         self.stt_thread.start()
 
     def stop_mic(self):
         assert self.mic_thread is not None
+        # Switching the mic off also abandons the turn in progress
+        self.turn_thread.cancel()
         self.mic_thread.stop()
         self.mic_thread = None
         
         # stop visualizer
         self.visualizer.setActive(False)
 
-    def process_volume(self, vol):
-        self.visualizer.setActive(vol > 0.01)
+    def pause_listening(self):
+        """Stop taking instructions while the assistant is responding."""
+        if self.mic_thread is not None:
+            if self.barge_in:
+                # Full-duplex: the mic only watches for barge-in and the
+                # STT ignores what it hears (mostly our own voice)
+                self.stt_service.pause()
+                self.mic_thread.monitor()
+            else:
+                self.mic_thread.mute()
+        self.visualizer.setActive(False)
+
+    def resume_listening(self):
+        """Reopen the gate, unless the user switched the mic off meanwhile."""
+        self.stt_service.resume()
+        if self.mic_thread is not None:
+            self.start_mic()
+
+    def on_barge_in(self):
+        """The user started talking over the response: stop it and listen."""
+        if self.mic_thread is None or not self._responding:
+            return
+        print("✋ Barge-in")
+        self._barged_in = True
+
+        # The turn unwinds at its next checkpoint; cut the audio right away
+        self.turn_thread.cancel()
+        self.router.speech.cancel()
+        self.playback.stop()
+
+        # Their first words are already in the ring; let the STT hear them
+        self.current_instruction = ""
+        self.turn_taking.reset()
+        self.stt_service.resume(preroll_sec=self.barge_in_preroll_sec)
+        self.mic_thread.unmute()
 
     def on_transcript_received(self, text: str):
         # Update the TextDisplay with the transcript. Use the configured
         self.current_instruction = text
         self.text_display.set_text(text, QColor(220, 220, 230))
 
+    def on_turn_event(self, event: str, confidence: float, transcript: str):
+        """Start or drop speculative routing as the interim transcript evolves."""
+        if self.turn_taking.dispatched:
+            return
+
+        if event == "TurnResumed":
+            self.speculator.cancel()
+        elif transcript and self.router.intents.classify(transcript):
+            # Handled locally once the turn ends; no LLM call to get ahead of
+            return
+        elif event == "EagerEndOfTurn" and transcript:
+            self.speculator.speculate(transcript, self._speculative_decide())
+        elif event == "Update" and self.speculator.is_stable(transcript):
+            self.speculator.speculate(transcript, self._speculative_decide())
+
+    def _speculative_decide(self):
+        # Bind history here, on the GUI thread; the returned callable runs
+        # on the speculation worker.
+        router = self.router
+        context = self.conversation_history.get_formatted_context(router.context_budget)
+
+        async def decide(text: str):
+            return await router.adecide(router.build_prompt(text, context=context))
+
+        return decide
+
     def on_silence_detected(self):
-        """Called when user stops speaking for > 1 seconds. Send instruction to LLM."""
-        if self.current_instruction.strip():
-            # Pause mic to prevent AI response from being picked up
-            self.stop_mic()
-            
-            print(f"🎯 Instruction ready for LLM: {self.current_instruction}")
-            self.send_to_router_agent(self.current_instruction)
-            # Reset for next instruction
-            self.current_instruction = ""
+        """Called when the local VAD hears the user stop speaking."""
+        self.turn_taking.on_vad_silence()
+
+    def on_turn_complete(self, instruction: str, reason: str):
+        """Called by the turn-taking engine once the user's turn is over. Send instruction to LLM."""
+        # Gate mic to prevent AI response from being picked up
+        self.pause_listening()
+        self._responding = True
+
+        print(f"🎯 Instruction ready for LLM: {instruction}")
+        self.send_to_router_agent(instruction)
+        # Reset for next instruction
+        self.current_instruction = ""
 
     def send_to_router_agent(self, instruction: str):
-        """Process the instruction with an LLM and auto-restart mic after TTS finishes."""
+        """Hand the instruction to the turn thread; listening resumes once it completes."""
         print(f"Sending to LLM: {instruction}")
         # Update UI with processing status
         self.text_display.set_text(f"Processing: {instruction}...", QColor(200, 200, 255))
         
+        # Context of the turns so far, within the router's token budget
+        context = self.conversation_history.get_formatted_context(self.router.context_budget)
+
         # Add user message to history
         self.conversation_history.add_user_message(instruction)
         
-        # Pass conversation history and instruction to router
-        router = RouterAgent(self.content_area_ui.set_content_area_markdown)
-        response = router.run(instruction, history=self.conversation_history.get_messages())
-        
+        # Reuse the speculative routing decision if it matches the final text
+        decision = self.speculator.claim(instruction)
+
+        # Pass conversation context and instruction to router
+        self.turn_thread.submit(TurnRequest(
+            router=self.router,
+            instruction=instruction,
+            context=context,
+            decision=decision
+        ))
+
+    def on_turn_progress(self, status: str):
+        self.text_display.set_text(status, QColor(200, 200, 255))
+
+    def on_turn_finished(self, instruction: str, response):
         # Add assistant response to history (if available)
         if response:
             self.conversation_history.add_assistant_message(response)
+        self._responding = False
         
-        # Auto-restart mic after LLM/TTS completes
-        self.start_mic()
+        if self._barged_in:
+            # Already listening to the user's next turn
+            self._barged_in = False
+            return
+
+        # Resume listening after LLM/TTS completes
+        self.resume_listening()
 
     def closeEvent(self, event):
         """Ensure background threads and async loops are stopped on window close."""
@@ -133,6 +295,15 @@ class MainWindow(QWidget):
         except Exception:
             pass
 
+        self.speculator.shutdown()
+        self.playback.close()
+        self.conversation_history.shutdown()
+
+        try:
+            self.turn_thread.stop()
+        except Exception:
+            pass
+
         super().closeEvent(event)
 
 
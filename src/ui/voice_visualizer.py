@@ -1,8 +1,13 @@
 import random
+from typing import Optional
+
+import numpy as np
 from PyQt6.QtGui import QPainter, QBrush, QColor
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtWidgets import QWidget
 
+from src.lib.ring_buffer import RingReader
+
 class VoiceVisualizer(QWidget):
     def __init__(
             self, 
@@ -16,6 +21,10 @@ class VoiceVisualizer(QWidget):
         self.target_values = [0.0] * bar_count
         self.active = False
 
+        # Optional mic ring reader polled on every animation tick
+        self.audio_source: Optional[RingReader] = None
+        self.threshold = 0.01
+
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_animation)
         self.timer.start(50)
@@ -33,7 +42,23 @@ class VoiceVisualizer(QWidget):
             # self.bar_color = QColor(100, 100, 100)
             self.target_values = [0.02] * self.bar_count
 
+    def set_audio_source(self, reader: Optional[RingReader], threshold: float = 0.01):
+        """Drive the bars from a mic ring reader (RMS above `threshold` is voice)."""
+        self.audio_source = reader
+        self.threshold = threshold
+
+    def poll_audio(self):
+        if self.audio_source is None:
+            return
+
+        chunk = self.audio_source.read()
+        if len(chunk):
+            rms = float(np.sqrt(np.mean(np.square(chunk))))
+            self.setActive(rms >= self.threshold)
+
     def update_animation(self):
+        self.poll_audio()
+
         if self.active:
             self.target_values = [random.random() for _ in range(self.bar_count)]
 
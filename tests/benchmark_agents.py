@@ -0,0 +1,157 @@
+import sys
+import os
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+# Ensure project root is on sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.llm import MemoryCache, get_provider
+from src.llm.cache import CachedProvider
+from src.llm.llm_response import LLMResponse
+from src.agents.router import RouterAgent
+from src.agents.router.intent import DecisionLog, IntentClassifier
+from src.agents.task.engine import TaskAgent
+from src.agents.reasoner import ReasoningAgent
+
+# Runs fully offline: the agents are built on the "replay" provider (no
+# Gemini client) and the router without TTS. Pass --recording to replay a
+# session captured with LLM_RECORD_PATH.
+
+# Every agent shares the pooled replay provider; scripts are told apart by
+# a phrase of each agent's system prompt
+ROUTER_SYSTEM = "Routing Engine"
+TASK_SYSTEM = "Autonomous Desktop Agent"
+REASONER_SYSTEM = "Deep Reasoning Engine"
+
+TASK_REQUEST = "check disk and memory usage"
+REASONING_REQUEST = "explain a binary search tree"
+
+ROUTER_SCRIPT = [
+    ("hi there", {"type": "instant_response", "response_text": "Hey! How can I help?"}),
+    (TASK_REQUEST, {"type": "tool_invocation", "response_text": "Checking that now."}),
+    (REASONING_REQUEST, {"type": "advanced_reasoning", "response_text": "Let me think about that..."}),
+]
+
+def replay(args):
+    provider = get_provider("replay", args.recording or "")
+    provider.first_token_sec = args.first_token_ms / 1000
+    provider.total_sec = max(args.total_ms / 1000, provider.first_token_sec)
+
+    for match, decision in ROUTER_SCRIPT:
+        provider.script(match, LLMResponse(text_content=json.dumps(decision)), ROUTER_SYSTEM)
+    provider.script(TASK_REQUEST, LLMResponse(tool_calls=[
+        {"name": "run_bash", "args": {"command": "echo disk"}},
+        {"name": "run_bash", "args": {"command": "echo memory"}},
+    ]), TASK_SYSTEM)
+    provider.script("function_response", LLMResponse(text_content="Disk and memory look fine."), TASK_SYSTEM)
+    provider.script("", LLMResponse(text_content=json.dumps({
+        "voice_summary": "Here is how a binary search tree works.",
+        "display_content": "# Binary search tree\n...",
+    })), REASONER_SYSTEM)
+    return provider
+
+def cold(*agents):
+    """Drop cached responses so every iteration reaches the provider."""
+    for agent in agents:
+        if isinstance(agent.llm.model, CachedProvider):
+            agent.llm.model.backend.clear()
+
+def report(name: str, latencies: list, wall: float):
+    latencies = sorted(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{name:<28} n={len(latencies):<4} p50={statistics.median(latencies) * 1000:7.1f} ms  "
+          f"p95={p95 * 1000:7.1f} ms  throughput={len(latencies) / wall:7.1f}/s")
+
+def bench_router(router: RouterAgent, args):
+    latencies = []
+    started = time.perf_counter()
+    for i in range(args.iterations):
+        cold(router)
+        text = ROUTER_SCRIPT[i % len(ROUTER_SCRIPT)][0]
+        t = time.perf_counter()
+        router.decide(router.build_prompt(text))
+        latencies.append(time.perf_counter() - t)
+    report("router.decide (sync)", latencies, time.perf_counter() - started)
+
+    async def concurrent():
+        async def one(text):
+            t = time.perf_counter()
+            await router.adecide(router.build_prompt(text))
+            return time.perf_counter() - t
+
+        texts = [ROUTER_SCRIPT[i % len(ROUTER_SCRIPT)][0] for i in range(args.iterations)]
+        return await asyncio.gather(*(one(text) for text in texts))
+
+    cold(router)
+    started = time.perf_counter()
+    latencies = asyncio.run(concurrent())
+    report("router.adecide (concurrent)", latencies, time.perf_counter() - started)
+
+def bench_run(router: RouterAgent, args, log_path: Path):
+    # Whole turns: routing, early task/reasoning work and the final answer
+    by_type = {decision["type"]: [] for _, decision in ROUTER_SCRIPT}
+    started = time.perf_counter()
+    for i in range(args.iterations):
+        cold(router, router.task_agent, router.reasoner)
+        # Untrained each time, so routes come from the LLM rather than the fast path
+        router.intents = IntentClassifier(DecisionLog(log_path), log_decisions=False)
+        text, decision = ROUTER_SCRIPT[i % len(ROUTER_SCRIPT)]
+        t = time.perf_counter()
+        router.run(text)
+        by_type[decision["type"]].append(time.perf_counter() - t)
+    wall = time.perf_counter() - started
+    for type, latencies in by_type.items():
+        if latencies:
+            report(f"router.run ({type})", latencies, wall)
+
+def bench_task(agent: TaskAgent, args):
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(args.iterations):
+        t = time.perf_counter()
+        agent.execute_task(TASK_REQUEST)
+        latencies.append(time.perf_counter() - t)
+    report("task.execute_task (2 tools)", latencies, time.perf_counter() - started)
+
+def bench_reasoner(agent: ReasoningAgent, args):
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(args.iterations):
+        cold(agent)
+        t = time.perf_counter()
+        agent.reason(REASONING_REQUEST)
+        latencies.append(time.perf_counter() - t)
+    report("reasoner.reason", latencies, time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline agent latency/throughput benchmark")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--first-token-ms", type=float, default=150)
+    parser.add_argument("--total-ms", type=float, default=400)
+    parser.add_argument("--recording", help="jsonl captured with LLM_RECORD_PATH")
+    args = parser.parse_args()
+
+    print(f"Simulated LLM latency: first token {args.first_token_ms:.0f} ms, total {args.total_ms:.0f} ms\n")
+
+    replay(args)
+    model = args.recording or ""
+    router = RouterAgent(lambda _: None, provider="replay", model=model, tts_provider=None)
+    reasoner = ReasoningAgent(provider="replay", model=model)
+    # Keep benchmark answers out of the on-disk reasoning cache
+    for agent in (router.reasoner, reasoner):
+        agent.llm.model.backend = MemoryCache()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bench_router(router, args)
+        bench_run(router, args, Path(tmp) / "decisions.jsonl")
+        bench_task(TaskAgent(provider="replay", model=model), args)
+        bench_reasoner(reasoner, args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import sys
+import os
+
+# Ensure project root is on sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.agents.router.intent import DecisionLog, intent_report
+
+def main():
+    log = DecisionLog(sys.argv[1]) if len(sys.argv) > 1 else DecisionLog()
+    samples = log.read()
+    print(f"{len(samples)} recorded router decisions in {log.path}\n")
+
+    if not samples:
+        return
+
+    report = intent_report(samples)
+
+    print(f"{'intent':<20} {'precision':>9} {'recall':>7} {'support':>8}")
+    for label, scores in report.items():
+        print(f"{label:<20} {scores['precision']:>9.2f} {scores['recall']:>7.2f} {scores['support']:>8}")
+
+if __name__ == "__main__":
+    main()